@@ -3,14 +3,18 @@ Collection of base utils for MCP servers.
 """
 
 import contextlib
-from collections import deque
-from dataclasses import dataclass
-from typing import AsyncIterator
-from uuid import uuid4
+import itertools
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Optional
 from starlette.applications import Starlette
-from starlette.routing import Mount
-from starlette.types import Receive, Scope, Send
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware import Middleware
+from starlette.routing import BaseRoute, Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from databricks.labs.mcp.metrics import METRICS
 from databricks.labs.mcp.utils import logger
 from mcp.server import Server
 
@@ -23,63 +27,130 @@ from mcp.server.streamable_http import (
 )
 from mcp.types import JSONRPCMessage
 
+try:
+    import zstandard
+except ImportError:
+    # Responses are then only compressed with gzip
+    zstandard = None
 
-@dataclass
-class EventEntry:
+
+class StreamEvents:
     """
-    Represents an event entry in the event store.
+    The retained events of a stream. Events are numbered with a per-stream sequence,
+    so the position of an event is its sequence number minus the first retained one.
     """
 
-    event_id: EventId
-    stream_id: StreamId
-    message: JSONRPCMessage
+    __slots__ = ("stream_id", "key", "first_seq", "events", "size", "last_used")
+
+    def __init__(self, stream_id: StreamId, key: int):
+        self.stream_id = stream_id
+        # Unique per store, stream IDs may be reused, e.g. JSON-RPC request IDs
+        self.key = key
+        self.first_seq = 0
+        # (message, approximate size in bytes) of the retained events, oldest first
+        self.events: deque[tuple[JSONRPCMessage, int]] = deque()
+        self.size = 0
+        self.last_used = time.monotonic()
+
+    def get_event_id(self, seq: int) -> EventId:
+        return f"{self.key}-{seq}"
 
 
 class InMemoryEventStore(EventStore):
     """
-    Simple in-memory implementation of the EventStore interface for resumability.
-    This is primarily intended for examples and testing, not for production use
-    where a persistent storage solution would be more appropriate.
+    In-memory implementation of the EventStore interface for resumability.
 
-    This implementation keeps only the last N events per stream for memory efficiency.
+    Event IDs encode the stream and the sequence number of the event in the stream,
+    so the resume point of a replay is found without scanning. The store keeps the
+    last N events per stream, and its total size is bounded: streams idle for too
+    long, then the least recently used streams, are evicted first.
     """
 
-    def __init__(self, max_events_per_stream: int = 100):
+    def __init__(
+        self,
+        max_events_per_stream: int = 100,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_idle_seconds: float = 3600,
+    ):
         """Initialize the event store.
 
         Args:
             max_events_per_stream: Maximum number of events to keep per stream
+            max_bytes: Approximate memory budget (JSON encoded size) of all events
+            max_idle_seconds: Time after which a stream without new events or
+                replays is evicted
         """
         self.max_events_per_stream = max_events_per_stream
-        # for maintaining last N events per stream
-        self.streams: dict[StreamId, deque[EventEntry]] = {}
-        # event_id -> EventEntry for quick lookup
-        self.event_index: dict[EventId, EventEntry] = {}
+        self.max_bytes = max_bytes
+        self.max_idle_seconds = max_idle_seconds
+        # Streams in least recently used order
+        self.streams: OrderedDict[StreamId, StreamEvents] = OrderedDict()
+        self._streams_by_key: dict[int, StreamEvents] = {}
+        self._stream_keys = itertools.count()
+        self.event_count = 0
+        self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of streams and events held, and their size."""
+        return {
+            "streams": len(self.streams),
+            "events": self.event_count,
+            "bytes": self.size,
+        }
 
     async def store_event(
         self, stream_id: StreamId, message: JSONRPCMessage
     ) -> EventId:
-        """Stores an event with a generated event ID."""
-        event_id = str(uuid4())
-        event_entry = EventEntry(
-            event_id=event_id, stream_id=stream_id, message=message
-        )
+        """Stores an event, returns its ID."""
+        now = time.monotonic()
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = StreamEvents(stream_id, next(self._stream_keys))
+            self.streams[stream_id] = stream
+            self._streams_by_key[stream.key] = stream
+        else:
+            self.streams.move_to_end(stream_id)
+        stream.last_used = now
 
-        # Get or create deque for this stream
-        if stream_id not in self.streams:
-            self.streams[stream_id] = deque(maxlen=self.max_events_per_stream)
+        seq = stream.first_seq + len(stream.events)
+        size = len(message.model_dump_json(by_alias=True, exclude_none=True))
+        stream.events.append((message, size))
+        stream.size += size
+        self.event_count += 1
+        self.size += size
+        if len(stream.events) > self.max_events_per_stream:
+            self._drop_oldest_event(stream)
+        self._evict(now, stream)
+        return stream.get_event_id(seq)
 
-        # If deque is full, the oldest event will be automatically removed
-        # We need to remove it from the event_index as well
-        if len(self.streams[stream_id]) == self.max_events_per_stream:
-            oldest_event = self.streams[stream_id][0]
-            self.event_index.pop(oldest_event.event_id, None)
+    def _drop_oldest_event(self, stream: StreamEvents) -> None:
+        _, size = stream.events.popleft()
+        stream.first_seq += 1
+        stream.size -= size
+        self.event_count -= 1
+        self.size -= size
 
-        # Add new event
-        self.streams[stream_id].append(event_entry)
-        self.event_index[event_id] = event_entry
+    def _remove_stream(self, stream: StreamEvents) -> None:
+        del self.streams[stream.stream_id]
+        del self._streams_by_key[stream.key]
+        self.event_count -= len(stream.events)
+        self.size -= stream.size
 
-        return event_id
+    def _evict(self, now: float, current_stream: StreamEvents) -> None:
+        # The least recently used stream comes first, stop at the first one to keep
+        while self.streams:
+            stream = next(iter(self.streams.values()))
+            if stream is current_stream:
+                break
+            if (
+                now - stream.last_used <= self.max_idle_seconds
+                and self.size <= self.max_bytes
+            ):
+                break
+            self._remove_stream(stream)
+        # Only the current stream is left over budget, keep at least its last event
+        while self.size > self.max_bytes and len(current_stream.events) > 1:
+            self._drop_oldest_event(current_stream)
 
     async def replay_events_after(
         self,
@@ -87,43 +158,234 @@ class InMemoryEventStore(EventStore):
         send_callback: EventCallback,
     ) -> StreamId | None:
         """Replays events that occurred after the specified event ID."""
-        if last_event_id not in self.event_index:
+        try:
+            key, last_seq = (int(part) for part in last_event_id.split("-"))
+        except ValueError:
+            key, last_seq = -1, -1
+        stream = self._streams_by_key.get(key)
+        if stream is None or not (
+            stream.first_seq <= last_seq < stream.first_seq + len(stream.events)
+        ):
             logger.warning(f"Event ID {last_event_id} not found in store")
             return None
 
-        # Get the stream and find events after the last one
-        last_event = self.event_index[last_event_id]
-        stream_id = last_event.stream_id
-        stream_events = self.streams.get(last_event.stream_id, deque())
+        self.streams.move_to_end(stream.stream_id)
+        stream.last_used = time.monotonic()
+        # Copied first, events may be stored or evicted while replaying
+        start = last_seq + 1 - stream.first_seq
+        events = [
+            (stream.get_event_id(stream.first_seq + i), stream.events[i][0])
+            for i in range(start, len(stream.events))
+        ]
+        for event_id, message in events:
+            await send_callback(EventMessage(message, event_id))
+
+        return stream.stream_id
+
+
+def register_event_store_metrics(event_store: EventStore) -> None:
+    """Exposes the stream and event counts and the size of the event store."""
+    if not hasattr(event_store, "stats"):
+        return
+    for stat, help in [
+        ("streams", "Number of streams held by the event store"),
+        ("events", "Number of events held by the event store"),
+        ("bytes", "Approximate size of the events held by the event store"),
+    ]:
+        METRICS.collected(
+            f"mcp_event_store_{stat}",
+            help,
+            (),
+            lambda stat=stat: [((), event_store.stats()[stat])],
+        )
+
+
+# Sent uncompressed, so that each event is delivered as soon as it is sent
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream",)
 
-        # Events in deque are already in chronological order
-        found_last = False
-        for event in stream_events:
-            if found_last:
-                await send_callback(EventMessage(event.message, event.event_id))
-            elif event.event_id == last_event_id:
-                found_last = True
 
-        return stream_id
+class GzipCompressor:
+    content_encoding = "gzip"
 
+    def __init__(self, level: int = 6):
+        # wbits=31 writes the gzip header and trailer around the deflate stream
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, more_data: bool) -> bytes:
+        if more_data:
+            # Ends the current block so the client can decode what was sent so far
+            return self.compressor.compress(data) + self.compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        return self.compressor.compress(data) + self.compressor.flush()
+
+
+class ZstdCompressor:
+    content_encoding = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, more_data: bool) -> bytes:
+        if more_data:
+            # Ends the current block so the client can decode what was sent so far
+            return self.compressor.compress(data) + self.compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        return self.compressor.compress(data) + self.compressor.flush()
+
+
+class CompressionResponder:
+    """
+    Sends a single response of ``app``, with its body compressed by ``compressor``.
+    Responses smaller than ``minimum_size``, already encoded responses and event
+    streams are sent as is, as are all responses when ``compressor`` is None.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        compressor: Optional[GzipCompressor | ZstdCompressor],
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressor = compressor
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.compress = False
 
-def get_serveable_app(app: Server, json_response: bool = True) -> Starlette:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message tells whether to compress
+            self.initial_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            self.compress = (
+                self.compressor is not None
+                and "content-encoding" not in headers
+                and not headers.get("content-type", "").startswith(
+                    UNCOMPRESSED_CONTENT_TYPES
+                )
+                and (more_body or len(body) >= self.minimum_size)
+            )
+            if "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+            if self.compress:
+                message["body"] = self.compressor.compress(body, more_body)
+                headers["Content-Encoding"] = self.compressor.content_encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+        elif self.compress:
+            message["body"] = self.compressor.compress(body, more_body)
+        await self.send(message)
+
+
+def _get_accepted_encodings(accept_encoding: str) -> set[str]:
+    encodings = set()
+    for item in accept_encoding.split(","):
+        encoding, *params = (part.strip() for part in item.split(";"))
+        if not any(param.replace(" ", "") in ("q=0", "q=0.0") for param in params):
+            encodings.add(encoding.lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Compresses the responses of at least ``minimum_size`` bytes with zstd or gzip,
+    whichever the client accepts, preferring zstd when the zstandard package is
+    installed. Event streams are sent uncompressed so each event is delivered as soon
+    as it is sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encodings = _get_accepted_encodings(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        compressor: Optional[GzipCompressor | ZstdCompressor] = None
+        if zstandard is not None and "zstd" in encodings:
+            compressor = ZstdCompressor(self.zstd_level)
+        elif "gzip" in encodings:
+            compressor = GzipCompressor(self.gzip_level)
+        responder = CompressionResponder(self.app, self.minimum_size, compressor)
+        await responder(scope, receive, send)
+
+
+class StreamableHTTPASGIApp:
+    """ASGI app handing the requests over to a streamable HTTP session manager."""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def get_serveable_app(
+    app: Server,
+    json_response: bool = True,
+    event_store: Optional[EventStore] = None,
+    stateless: bool = False,
+    mount_path: str = "/mcp",
+    routes: Optional[list[BaseRoute]] = None,
+    compression_minimum_size: int = 1024,
+    debug: bool = False,
+) -> Starlette:
+    """
+    Returns an ASGI app serving ``app`` over streamable HTTP at ``mount_path``,
+    followed by the given ``routes``.
+
+    With ``json_response``, every response is buffered and sent as one JSON document,
+    which is compressed when large enough. Otherwise responses are streamed as server
+    sent events, which carry progress notifications but are not compressed. A
+    stateless app keeps no session between requests and can run in several worker
+    processes, but its responses cannot be resumed.
+    """
     logger.info("Creating MCP app...")
 
-    event_store = InMemoryEventStore()
+    if event_store is None and not stateless:
+        event_store = InMemoryEventStore()
 
     # Create the session manager with our app and event store
     session_manager = StreamableHTTPSessionManager(
         app=app,
         event_store=event_store,  # Enable resumability
         json_response=json_response,
+        stateless=stateless,
     )
 
     # ASGI handler for streamable HTTP connections
-    async def handle_streamable_http(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await session_manager.handle_request(scope, receive, send)
+    handle_streamable_http = StreamableHTTPASGIApp(session_manager)
 
     @contextlib.asynccontextmanager
     async def lifespan(app: Starlette) -> AsyncIterator[None]:
@@ -135,12 +397,23 @@ def get_serveable_app(app: Server, json_response: bool = True) -> Starlette:
             finally:
                 logger.info("Application shutting down...")
 
+    middleware = []
+    if compression_minimum_size:
+        middleware.append(
+            Middleware(CompressionMiddleware, minimum_size=compression_minimum_size)
+        )
+
     logger.info("MCP app created successfully!")
     # Create an ASGI application using the transport
     return Starlette(
-        debug=True,
+        debug=debug,
         routes=[
-            Mount("/mcp", app=handle_streamable_http),
+            # Without a trailing slash the request would not reach the mount, and would
+            # fall through to a catch-all route among ``routes``
+            Route(mount_path, endpoint=handle_streamable_http),
+            Mount(mount_path, app=handle_streamable_http),
+            *(routes or []),
         ],
+        middleware=middleware,
         lifespan=lifespan,
     )
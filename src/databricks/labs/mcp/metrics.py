@@ -0,0 +1,192 @@
+"""
+Minimal Prometheus metrics, exposed in the text exposition format.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from fast cache hits to slow Genie conversations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+Labels = tuple[str, ...]
+# Collects the current values of a metric, by label values
+Collector = Callable[[], Iterable[tuple[Labels, float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(label_names: Labels, label_values: Labels) -> str:
+    if not label_names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(label_names, label_values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[tuple[str, Labels, Labels, float]]:
+        """Yields the (name suffix, label names, label values, value) samples."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, label_names, label_values, value in self.samples():
+            labels = _format_labels(label_names, label_values)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()):
+        super().__init__(name, help, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            yield "", self.label_names, label_values, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = buckets
+        # label values -> (count per bucket, the last one being +Inf, sum)
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            if label_values not in self._values:
+                self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = self._values[label_values]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def samples(self):
+        with self._lock:
+            values = [
+                (label_values, list(counts), total[0])
+                for label_values, (counts, total) in self._values.items()
+            ]
+        bucket_label_names = (*self.label_names, "le")
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield "_bucket", bucket_label_names, (
+                    *label_values,
+                    _format_value(float(bound)),
+                ), cumulative
+            yield "_count", self.label_names, label_values, cumulative
+            yield "_sum", self.label_names, label_values, total
+
+
+class CollectedMetric(Metric):
+    """Metric whose values are read from the application when it is scraped."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Labels,
+        collect: Collector,
+        type: str = "gauge",
+    ):
+        super().__init__(name, help, label_names)
+        self.collect = collect
+        self.type = type
+
+    def samples(self):
+        for label_values, value in self.collect():
+            yield "", self.label_names, label_values, value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            # Registering again, e.g. when an app is created twice, replaces it
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Labels = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Labels = ()) -> Histogram:
+        return self._register(Histogram(name, help, label_names))
+
+    def collected(
+        self,
+        name: str,
+        help: str,
+        label_names: Labels,
+        collect: Collector,
+        type: str = "gauge",
+    ) -> CollectedMetric:
+        return self._register(CollectedMetric(name, help, label_names, collect, type))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def get_metrics_route(registry: MetricsRegistry = METRICS) -> Route:
+    """Returns the ``/metrics`` route exposing the metrics of the registry."""
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    return Route("/metrics", metrics, methods=["GET"])
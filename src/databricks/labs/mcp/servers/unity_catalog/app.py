@@ -1,16 +1,27 @@
-from fastapi import FastAPI
+from starlette.routing import Mount
 
-from databricks.labs.mcp.servers.unity_catalog.tools import get_prepared_mcp_app
+from databricks.labs.mcp.base import get_serveable_app, register_event_store_metrics
+from databricks.labs.mcp.metrics import get_metrics_route
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.servers.unity_catalog.tools import (
+    get_event_store,
+    get_prepared_mcp_app,
+)
 from databricks.labs.mcp.utils import get_app_index_route
 
 
 mcp = get_prepared_mcp_app()
+settings = get_settings()
+event_store = get_event_store(settings)
+if event_store is not None:
+    register_event_store_metrics(event_store)
 
-app = FastAPI(
-    lifespan=lambda _: mcp.session_manager.run(),
+app = get_serveable_app(
+    mcp._mcp_server,
+    json_response=settings.json_response,
+    event_store=event_store,
+    stateless=settings.stateless_http,
+    mount_path="/api/mcp",
+    routes=[get_metrics_route(), Mount("/", app=get_app_index_route())],
+    compression_minimum_size=settings.response_compression_min_bytes,
 )
-
-streamable_app = mcp.streamable_http_app()
-
-app.mount("/api", streamable_app)
-app.mount("/", get_app_index_route())
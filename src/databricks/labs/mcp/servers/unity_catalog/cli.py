@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import List, Optional
 from pydantic import field_validator
 from functools import lru_cache
@@ -8,6 +9,8 @@ from pydantic import (
 )
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+DEFAULT_DISCOVERY_MAX_CONCURRENCY = 16
+
 
 class CliSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -22,7 +25,9 @@ class CliSettings(BaseSettings):
         default=None,
         description="The name of the schema within a Unity Catalog "
         "catalog. Schemas organize assets, providing a structured "
-        "namespace for data objects.",
+        "namespace for data objects. Several schemas can be served by one "
+        "server as a comma-separated list, and each entry may use shell-style "
+        "wildcards, e.g. 'main.*' or 'a.b,c.d'.",
         validation_alias=AliasChoices("s", "schema_full_name", "schema_name"),
     )
 
@@ -40,15 +45,247 @@ class CliSettings(BaseSettings):
         ),
     )
 
+    vector_search_index_cache_ttl_seconds: int = Field(
+        default=900,
+        ge=0,
+        description="How long vector search index handles are reused before being "
+        "fetched again. Set to 0 to fetch the index on every query.",
+    )
+
+    vector_search_max_cell_bytes: int = Field(
+        default=4096,
+        ge=0,
+        description="Maximum size in bytes of a text value returned by vector search "
+        "tools, longer values are truncated. Set to 0 for no limit.",
+    )
+
+    vector_search_max_response_bytes: int = Field(
+        default=256 * 1024,
+        ge=0,
+        description="Maximum size in bytes of a vector search tool response, rows "
+        "beyond it are left out. Set to 0 for no limit.",
+    )
+
+    vector_search_batch_tools: bool = Field(
+        default=True,
+        description="Expose, for every vector search index, a batch tool that runs "
+        "several queries against the index in one call",
+    )
+
+    vector_search_batch_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of queries of one batch vector search call that "
+        "run concurrently",
+    )
+
+    vector_search_result_cache_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="How long vector search results are reused for repeated queries "
+        "against the same index. Set to 0 to disable the result cache.",
+    )
+
+    vector_search_result_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Approximate memory budget of the vector search result cache, "
+        "least recently used results are evicted beyond it",
+    )
+
+    vector_search_result_cache_excluded_indexes: List[str] = Field(
+        default_factory=list,
+        description="Comma-separated list of vector search indexes (full names, "
+        "wildcards allowed) whose results are never cached, e.g. indexes that are "
+        "updated continuously.",
+    )
+
+    discovery_max_concurrency: int = Field(
+        default=DEFAULT_DISCOVERY_MAX_CONCURRENCY,
+        ge=1,
+        description="Maximum number of concurrent metadata calls made while "
+        "discovering tools at startup",
+    )
+
+    catalog_snapshot_dir: Optional[str] = Field(
+        default=str(Path.home() / ".cache" / "databricks-labs-mcp"),
+        description="Directory where the discovered tool catalog is snapshotted, so "
+        "that new processes can serve tools before discovery completes. Set to an "
+        "empty value to disable snapshots.",
+    )
+
+    json_response: bool = Field(
+        default=False,
+        description="Send every streamable HTTP response as one buffered JSON "
+        "document instead of a stream of server sent events. JSON responses are "
+        "compressed, streams are not but deliver progress notifications as they come.",
+    )
+
+    response_compression_min_bytes: int = Field(
+        default=1024,
+        ge=0,
+        description="Minimum size of the HTTP responses compressed with zstd or gzip, "
+        "depending on what the client accepts. Set to 0 to disable compression.",
+    )
+
+    stateless_http: bool = Field(
+        default=False,
+        description="Serve streamable HTTP statelessly: every request is handled on "
+        "its own, without a session kept in process memory, so that the app can run "
+        "with several worker processes. Responses cannot be resumed in this mode.",
+    )
+
+    catalog_refresh_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="Interval at which the schema is checked for new, changed or "
+        "removed functions and vector search indexes. Set to 0 to disable.",
+    )
+
+    tools_list_page_size: int = Field(
+        default=0,
+        ge=0,
+        description="Maximum number of tools returned per tools/list page, clients "
+        "fetch further pages with the returned cursor. Set to 0 to return all tools "
+        "in a single page.",
+    )
+
+    genie_space_cache_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="Age after which cached Genie space metadata is fetched again in "
+        "the background, while the cached metadata keeps being served. Set to 0 to "
+        "fetch spaces on every call.",
+    )
+
+    genie_result_cache_ttl_seconds: int = Field(
+        default=3600,
+        ge=0,
+        description="How long completed Genie messages and successful attachment "
+        "query results, which do not change anymore, are cached. Set to 0 to disable.",
+    )
+
+    genie_result_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Approximate memory budget of the Genie result cache, least "
+        "recently used results are evicted beyond it",
+    )
+
+    genie_execute_query_staleness_seconds: int = Field(
+        default=0,
+        ge=0,
+        description="How long the result of genie_execute_query is reused instead of "
+        "running the attachment query again. Set to 0 to always run the query.",
+    )
+
+    genie_download_dir: str = Field(
+        default=str(Path.home() / ".cache" / "databricks-labs-mcp" / "genie-downloads"),
+        description="Directory where full Genie query results fetched with "
+        "genie_fetch_download are stored as Arrow files",
+    )
+
+    genie_download_retention_seconds: int = Field(
+        default=24 * 3600,
+        ge=0,
+        description="Age after which downloads that were not read are deleted from "
+        "the download directory. Set to 0 to keep them regardless of their age.",
+    )
+
+    genie_download_max_bytes: int = Field(
+        default=10 * 1024 * 1024 * 1024,
+        ge=0,
+        description="Disk budget of the download directory, least recently read "
+        "downloads are deleted beyond it. Set to 0 to disable the budget.",
+    )
+
+    genie_max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum number of Genie tool calls executed concurrently",
+    )
+
+    vector_search_max_concurrency: int = Field(
+        default=16,
+        ge=1,
+        description="Maximum number of vector search tool calls executed concurrently",
+    )
+
+    uc_function_batch_tools: bool = Field(
+        default=False,
+        description="Expose, for every UC function, a batch tool that runs the "
+        "function once per parameter set in one call",
+    )
+
+    uc_function_batch_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of executions of one batch UC function call that "
+        "run concurrently",
+    )
+
+    uc_function_result_cache_ttl_seconds: int = Field(
+        default=3600,
+        ge=0,
+        description="How long results of deterministic UC functions are reused for "
+        "calls with the same parameters. Set to 0 to disable the result cache.",
+    )
+
+    uc_function_result_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Approximate memory budget of the UC function result cache, "
+        "least recently used results are evicted beyond it",
+    )
+
+    uc_function_result_cache_ttl_overrides: List[str] = Field(
+        default_factory=list,
+        description="Comma-separated list of `function=seconds` entries overriding "
+        "the result cache TTL of deterministic UC functions (full names, wildcards "
+        "allowed), e.g. `main.sales.*=60`. Set to 0 to never cache a function.",
+    )
+
+    uc_function_max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum number of UC function tool calls executed concurrently",
+    )
+
+    max_connections_per_host: int = Field(
+        default=20,
+        ge=1,
+        description="Size of the keep-alive connection pool kept per Databricks host",
+    )
+
+    credential_refresh_seconds: int = Field(
+        default=1800,
+        ge=60,
+        description="Interval after which clients holding static tokens are rebuilt "
+        "in the background with fresh credentials",
+    )
+
+    def get_schema_patterns(self) -> list[str]:
+        """Returns the schemas to serve, each possibly containing wildcards."""
+        if not self.schema_full_name:
+            return []
+        return [s.strip() for s in self.schema_full_name.split(",") if s.strip()]
+
     def get_catalog_name(self):
-        return self.schema_full_name.split(".")[0] if self.schema_full_name else None
+        patterns = self.get_schema_patterns()
+        return patterns[0].split(".")[0] if patterns else None
 
     def get_schema_name(self):
-        return self.schema_full_name.split(".")[1] if self.schema_full_name else None
+        patterns = self.get_schema_patterns()
+        return patterns[0].split(".")[1] if patterns else None
 
-    @field_validator("genie_space_ids", mode="before")
+    @field_validator(
+        "genie_space_ids",
+        "vector_search_result_cache_excluded_indexes",
+        "uc_function_result_cache_ttl_overrides",
+        mode="before",
+    )
     @classmethod
-    def split_genie_space_ids(cls, v):
+    def split_comma_separated_lists(cls, v):
         if isinstance(v, str):
             return [s.strip() for s in v.split(",") if s.strip()]
         return v
@@ -64,8 +301,32 @@ class CliSettings(BaseSettings):
     @field_validator("schema_full_name", mode="before")
     @classmethod
     def validate_schema_full_name(cls, v):
-        if v is not None and len(v.split(".")) != 2:
-            raise ValueError("schema_full_name must be in the format 'catalog.schema'")
+        if isinstance(v, list):
+            v = ",".join(v)
+        if v is not None and any(
+            len(s.strip().split(".")) != 2 or not all(s.strip().split("."))
+            for s in v.split(",")
+        ):
+            raise ValueError(
+                "schema_full_name must be in the format 'catalog.schema', or a "
+                "comma-separated list of such names"
+            )
+        return v
+
+    @field_validator("uc_function_result_cache_ttl_overrides")
+    @classmethod
+    def validate_ttl_overrides(cls, v):
+        for override in v:
+            pattern, _, ttl_seconds = override.rpartition("=")
+            try:
+                valid = bool(pattern) and float(ttl_seconds) >= 0
+            except ValueError:
+                valid = False
+            if not valid:
+                raise ValueError(
+                    f"Invalid result cache TTL override '{override}', expected "
+                    "'function=seconds'"
+                )
         return v
 
 
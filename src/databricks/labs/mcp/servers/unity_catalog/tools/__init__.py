@@ -1,6 +1,14 @@
 import collections
-from typing import TypeAlias, Union
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, TypeAlias, Union
 from mcp.server.fastmcp import FastMCP
+from mcp.server.lowlevel import NotificationOptions
+from mcp.server.streamable_http import EventStore
+from mcp import types
 from mcp.types import (
     TextContent,
     ImageContent,
@@ -8,40 +16,221 @@ from mcp.types import (
 )
 
 from databricks.labs.mcp._version import __version__ as VERSION
-from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.base import InMemoryEventStore
+from databricks.labs.mcp.metrics import METRICS
+from databricks.labs.mcp.servers.unity_catalog.cli import CliSettings, get_settings
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    get_workspace_client,
+)
 from databricks.labs.mcp.servers.unity_catalog.tools.genie import (
     GenieTool,
+    get_genie_result_cache,
     list_genie_tools,
 )
 from databricks.labs.mcp.servers.unity_catalog.tools.functions import (
+    UCFunctionBatchTool,
     UCFunctionTool,
+    get_function_result_cache,
     list_uc_function_tools,
+    with_batch_tools as with_uc_function_batch_tools,
 )
 from databricks.labs.mcp.servers.unity_catalog.tools.vector_search import (
+    VectorSearchBatchTool,
     VectorSearchTool,
+    get_search_result_cache,
     list_vector_search_tools,
+    with_batch_tools as with_vector_search_batch_tools,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import get_tool_executor
+from databricks.labs.mcp.servers.unity_catalog.tools.schemas import (
+    resolve_schema_full_names,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.registry import (
+    ToolRegistry,
+    materialize_tool_specs,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.snapshot import (
+    get_snapshot_path,
+    load_snapshot,
+    save_snapshot,
 )
 from databricks.labs.mcp.utils import logger
 
 Content: TypeAlias = Union[TextContent, ImageContent, EmbeddedResource]
-AvailableTool = UCFunctionTool | VectorSearchTool | GenieTool
+AvailableTool = (
+    UCFunctionTool
+    | UCFunctionBatchTool
+    | VectorSearchTool
+    | VectorSearchBatchTool
+    | GenieTool
+)
+
+
+def with_batch_tools(tools: list[AvailableTool], settings) -> list[AvailableTool]:
+    """Returns the given tools followed by the enabled batch variants of each tool."""
+    tools = with_vector_search_batch_tools(tools, settings)
+    return with_uc_function_batch_tools(tools, settings)
+
+
+DISCOVERY_SECONDS = METRICS.histogram(
+    "mcp_discovery_seconds", "Duration of tool discovery, by source", ("source",)
+)
+
+RESULT_CACHES = {
+    "vector_search": get_search_result_cache,
+    "genie": get_genie_result_cache,
+    "uc_function": get_function_result_cache,
+}
+
+
+def _discover_tools(source: str, list_tools, *args) -> list[AvailableTool]:
+    start_time = time.monotonic()
+    tools = list_tools(*args)
+    elapsed = time.monotonic() - start_time
+    DISCOVERY_SECONDS.observe(elapsed, source)
+    logger.info(f"Discovered {len(tools)} {source} tools in {elapsed:.2f}s")
+    return tools
+
 
+def _collect_cache_stats(stat: str):
+    return [
+        ((cache,), get_cache().stats()[stat])
+        for cache, get_cache in RESULT_CACHES.items()
+    ]
+
+
+def _collect_executor_stats(stat: str):
+    return [
+        ((family,), family_stats[stat])
+        for family, family_stats in get_tool_executor().stats().items()
+    ]
+
+
+def register_metrics(registry: ToolRegistry) -> None:
+    """Exposes the state of the served tools, worker pools and result caches."""
+    METRICS.collected(
+        "mcp_tools", "Number of served tools", (), lambda: [((), len(registry.tools))]
+    )
+    METRICS.collected(
+        "mcp_sessions",
+        "Number of MCP sessions that listed or called tools",
+        (),
+        lambda: [((), registry.session_count)],
+    )
+    for stat, help in [
+        ("in_flight", "Number of blocking calls running, by API family"),
+        ("queued", "Number of blocking calls waiting for a worker, by API family"),
+        ("limit", "Maximum number of concurrent blocking calls, by API family"),
+    ]:
+        METRICS.collected(
+            f"mcp_executor_{stat}",
+            help,
+            ("family",),
+            functools.partial(_collect_executor_stats, stat),
+        )
+    METRICS.collected(
+        "mcp_coalesced_calls_total",
+        "Number of tool calls that shared the execution of an identical call",
+        (),
+        lambda: [((), get_tool_executor().single_flight.coalesced_calls)],
+        type="counter",
+    )
+    for stat, help, metric_type in [
+        ("hits", "Number of result cache hits", "counter"),
+        ("misses", "Number of result cache misses", "counter"),
+        ("evictions", "Number of results evicted from the cache", "counter"),
+        ("entries", "Number of results in the cache", "gauge"),
+        ("bytes", "Approximate size of the results in the cache", "gauge"),
+    ]:
+        METRICS.collected(
+            f"mcp_result_cache_{stat}" + ("_total" if metric_type == "counter" else ""),
+            help,
+            ("cache",),
+            functools.partial(_collect_cache_stats, stat),
+            type=metric_type,
+        )
 
-def list_all_tools(settings) -> list[AvailableTool]:
+
+def list_all_tools(
+    settings, previous_tools: Optional[list[AvailableTool]] = None
+) -> list[AvailableTool]:
     """
     Returns a list of all available tools, including Genie tools, UC functions, and vector search tools.
     This function aggregates tools from different sources and returns them in a single list.
+    Each source is queried once, and all sources are queried concurrently, with schema
+    assets discovered separately for every schema matching the settings. When the
+    previously discovered tools are given, only new or changed schema assets are fetched.
+    A schema that fails to be discovered is logged and keeps its previous tools, if any,
+    rather than failing the whole discovery.
     """
+    previous_tools = previous_tools or []
+    sources = {"genie": (list_genie_tools, settings)}
+    fallback_tools: dict[str, list[AvailableTool]] = {}
+    if settings.schema_full_name:
+        schema_full_names = resolve_schema_full_names(
+            get_workspace_client(),
+            settings.get_schema_patterns(),
+            settings.discovery_max_concurrency,
+        )
+        previous_vector_search_tools = [
+            tool for tool in previous_tools if isinstance(tool, VectorSearchTool)
+        ]
+        previous_uc_function_tools = [
+            tool for tool in previous_tools if isinstance(tool, UCFunctionTool)
+        ]
+        # Discovery is sharded by schema, index names are only unique per schema
+        qualify_tool_names = len(schema_full_names) > 1
+        for schema_full_name in schema_full_names:
+            source = f"vector search ({schema_full_name})"
+            sources[source] = (
+                list_vector_search_tools,
+                settings,
+                schema_full_name,
+                previous_vector_search_tools,
+                qualify_tool_names,
+            )
+            fallback_tools[source] = [
+                tool
+                for tool in previous_vector_search_tools
+                if tool.index_name.startswith(f"{schema_full_name}.")
+            ]
+        for schema_full_name in schema_full_names:
+            source = f"UC function ({schema_full_name})"
+            sources[source] = (
+                list_uc_function_tools,
+                settings,
+                schema_full_name,
+                previous_uc_function_tools,
+            )
+            fallback_tools[source] = [
+                tool
+                for tool in previous_uc_function_tools
+                if tool.uc_function_name.startswith(f"{schema_full_name}.")
+            ]
 
-    return (
-        list_genie_tools(settings)
-        + list_vector_search_tools(settings)
-        + list_uc_function_tools(settings)
-    )
+    max_workers = min(len(sources), settings.discovery_max_concurrency)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            source: pool.submit(_discover_tools, source, *list_tools_args)
+            for source, list_tools_args in sources.items()
+        }
+        # Keep the order of the sources, later tools win on duplicate names
+        all_tools = []
+        for source, future in futures.items():
+            try:
+                all_tools += future.result()
+            except Exception as e:
+                tools = fallback_tools.get(source, [])
+                logger.warning(
+                    f"Failed to discover {source} tools, keeping {len(tools)} "
+                    f"previously discovered tools: {e}"
+                )
+                all_tools += tools
+    return with_batch_tools(all_tools, settings)
 
 
 def _warn_if_duplicate_tool_names(tools: list[AvailableTool]):
-    tool_names = [tool.tool_spec.name for tool in tools]
+    tool_names = [tool.name for tool in tools]
     duplicate_tool_names = [
         item for item, count in collections.Counter(tool_names).items() if count > 1
     ]
@@ -53,16 +242,104 @@ def _warn_if_duplicate_tool_names(tools: list[AvailableTool]):
         )
 
 
-def get_tools_dict() -> dict[str, AvailableTool]:
+def get_tools_dict(
+    previous_tools: Optional[list[AvailableTool]] = None,
+) -> dict[str, AvailableTool]:
     """
     Returns a dictionary of all tools with their names as keys and tool objects as values.
     """
     # TODO: if LLM tool name length limits allow, dedup tool names by tool type
     # (e.g. function name and vector search index name)
     settings = get_settings()
-    all_tools = list_all_tools(settings=settings)
+    all_tools = list_all_tools(settings=settings, previous_tools=previous_tools)
     _warn_if_duplicate_tool_names(all_tools)
-    return {tool.tool_spec.name: tool for tool in list_all_tools(settings=settings)}
+    return {tool.name: tool for tool in all_tools}
+
+
+def _get_snapshot_path(settings: CliSettings) -> Optional[Path]:
+    # Genie tools are built without any API call, only schema assets are snapshotted
+    if not settings.schema_full_name:
+        return None
+    return get_snapshot_path(settings, host=get_workspace_client().config.host)
+
+
+def _save_snapshot(snapshot_path: Optional[Path], tools: list[AvailableTool]):
+    if snapshot_path is None:
+        return
+    try:
+        save_snapshot(snapshot_path, tools)
+    except OSError as e:
+        logger.warning(f"Failed to write tool catalog snapshot {snapshot_path}: {e}")
+
+
+def _load_tools_dict_from_snapshot(
+    settings: CliSettings, snapshot_path: Optional[Path]
+) -> Optional[dict[str, AvailableTool]]:
+    if snapshot_path is None:
+        return None
+    snapshot_tools = load_snapshot(snapshot_path, settings)
+    if snapshot_tools is None:
+        return None
+    all_tools = with_batch_tools(list_genie_tools(settings) + snapshot_tools, settings)
+    return {tool.name: tool for tool in all_tools}
+
+
+def _has_unfetched_definition(tool: AvailableTool) -> bool:
+    if isinstance(tool, UCFunctionBatchTool):
+        tool = tool.function_tool
+    return isinstance(tool, UCFunctionTool) and tool.tool_obj is None
+
+
+def _materialize_tool_specs(
+    registry: ToolRegistry,
+    tools: list[AvailableTool],
+    snapshot_path: Optional[Path],
+    max_concurrency: int,
+) -> list[types.Tool]:
+    """
+    Builds the specs of a tools/list page. UC function definitions fetched for the
+    page are written to the snapshot, so that warm starts do not fetch them again.
+    """
+    fetches_definitions = any(_has_unfetched_definition(tool) for tool in tools)
+    tool_specs = materialize_tool_specs(tools, max_concurrency)
+    if fetches_definitions:
+        _save_snapshot(snapshot_path, list(registry.tools.values()))
+    return tool_specs
+
+
+def _refresh_catalog(registry: ToolRegistry, snapshot_path: Optional[Path]):
+    try:
+        tools_dict = get_tools_dict(previous_tools=list(registry.tools.values()))
+    except Exception as e:
+        logger.warning(
+            f"Failed to refresh the tool catalog, keeping current tools: {e}"
+        )
+        return
+    if registry.swap(tools_dict):
+        logger.info(f"Tool catalog changed, now serving {len(tools_dict)} tools")
+        _save_snapshot(snapshot_path, list(tools_dict.values()))
+        registry.notify_tools_changed()
+
+
+def _run_catalog_refresher(
+    registry: ToolRegistry,
+    snapshot_path: Optional[Path],
+    refresh_seconds: int,
+    refresh_now: bool,
+):
+    if refresh_now:
+        _refresh_catalog(registry, snapshot_path)
+    while refresh_seconds:
+        time.sleep(refresh_seconds)
+        _refresh_catalog(registry, snapshot_path)
+
+
+def get_event_store(settings: CliSettings) -> Optional[EventStore]:
+    """Returns the event store used to resume streamable HTTP responses."""
+    if settings.stateless_http:
+        # Requests may be handled by any worker, there is no stream to resume
+        return None
+    return InMemoryEventStore()
 
 
 def get_prepared_mcp_app() -> FastMCP:
@@ -72,16 +349,63 @@ def get_prepared_mcp_app() -> FastMCP:
     mcp = FastMCP(
         name="mcp-unitycatalog",
     )
-    tools_dict = get_tools_dict()
+    settings = get_settings()
+    snapshot_path = _get_snapshot_path(settings)
+    tools_dict = _load_tools_dict_from_snapshot(settings, snapshot_path)
+    # A snapshot is served right away and revalidated against UC in the background
+    loaded_from_snapshot = tools_dict is not None
+    if not loaded_from_snapshot:
+        tools_dict = get_tools_dict()
+        _save_snapshot(snapshot_path, list(tools_dict.values()))
+    registry = ToolRegistry(tools_dict)
+    register_metrics(registry)
+    executor = get_tool_executor()
+
+    refresh_seconds = (
+        settings.catalog_refresh_seconds if settings.schema_full_name else 0
+    )
+    if refresh_seconds or loaded_from_snapshot:
+        threading.Thread(
+            target=_run_catalog_refresher,
+            args=(registry, snapshot_path, refresh_seconds, loaded_from_snapshot),
+            name="mcp-catalog-refresher",
+            daemon=True,
+        ).start()
+        # Advertise the tools/list_changed notifications sent after a refresh
+        mcp._mcp_server.create_initialization_options = functools.partial(
+            mcp._mcp_server.create_initialization_options,
+            notification_options=NotificationOptions(tools_changed=True),
+        )
+
+    # Registered directly rather than through the list_tools decorator, which does
+    # not support cursor pagination
+    async def list_tools(req: Optional[types.ListToolsRequest]):
+        registry.track_current_session()
+        cursor = req.params.cursor if req is not None and req.params else None
+        tools, next_cursor = registry.list_tools_page(
+            cursor, settings.tools_list_page_size
+        )
+        # Specs of UC functions are fetched on first access, only for this page
+        tool_specs = await executor.run_sync(
+            "discovery",
+            _materialize_tool_specs,
+            registry,
+            tools,
+            snapshot_path,
+            settings.discovery_max_concurrency,
+        )
+        return types.ServerResult(
+            types.ListToolsResult(tools=tool_specs, nextCursor=next_cursor)
+        )
 
-    @mcp._mcp_server.list_tools()
-    async def list_tools():
-        return [tool.tool_spec for tool in tools_dict.values()]
+    mcp._mcp_server.request_handlers[types.ListToolsRequest] = list_tools
 
     @mcp._mcp_server.call_tool()
     async def call_tool(name: str, arguments: dict):
-        tool = tools_dict[name]
-        return tool.execute(**arguments)
+        registry.track_current_session()
+        tool = registry.get_tool(name)
+        # Blocking tools run in the bounded worker pool of their family
+        return await executor.execute(tool, arguments)
 
     logger.info(f"Registered {len(tools_dict)} tools: {', '.join(tools_dict.keys())}")
     return mcp
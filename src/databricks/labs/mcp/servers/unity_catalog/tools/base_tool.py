@@ -1,13 +1,122 @@
+import functools
+import hashlib
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+import anyio
 from mcp.types import Tool as ToolSpec
 
 # Define a new abstract class for a tool
 from abc import ABC, abstractmethod
 
+DEFAULT_BATCH_MAX_CONCURRENCY = 4
+
+# Clients reject longer tool names, unitycatalog-ai truncates function names to it
+MAX_TOOL_NAME_LENGTH = 64
+
+
+def get_bounded_tool_name(name: str) -> str:
+    """
+    Returns ``name`` if it fits in MAX_TOOL_NAME_LENGTH. Longer names are cut and end
+    with a hash of the full name, so that two long names sharing a prefix stay distinct.
+    """
+    if len(name) <= MAX_TOOL_NAME_LENGTH:
+        return name
+    digest = hashlib.sha256(name.encode()).hexdigest()[:8]
+    return f"{name[: MAX_TOOL_NAME_LENGTH - len(digest) - 1]}_{digest}"
+
 
 class BaseTool(ABC):
-    def __init__(self, tool_spec: ToolSpec):
-        self.tool_spec = tool_spec
+    # Tools of the same family share a concurrency limit, see ToolExecutor
+    family: str = "default"
+    # Whether identical concurrent calls may share one execution, see SingleFlight.
+    # Tools with side effects must opt out.
+    coalesce_calls: bool = True
+
+    def __init__(self, tool_spec: Optional[ToolSpec]):
+        self._tool_spec = tool_spec
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self._tool_spec
+
+    @property
+    def name(self) -> str:
+        """Name of the tool, available without building the full tool spec."""
+        return self.tool_spec.name
+
+    def has_same_definition(self, other: "BaseTool") -> bool:
+        """Whether ``other`` is an equivalent tool, used to detect catalog changes."""
+        return self.tool_spec == other.tool_spec
+
+    @property
+    def is_async(self) -> bool:
+        """Whether the tool implements ``aexecute`` and runs on the event loop."""
+        return False
 
     @abstractmethod
     def execute(self, **kwargs):
         pass
+
+    async def aexecute(self, **kwargs):
+        raise NotImplementedError(f"{type(self).__name__} has no async implementation")
+
+    def run_aexecute(self, **kwargs):
+        """Runs ``aexecute`` from synchronous code, on an event loop of its own."""
+        return anyio.run(functools.partial(self.aexecute, **kwargs))
+
+
+class BatchTool(BaseTool):
+    """
+    Base class of the batch variants of tools, which run several calls of a tool in
+    one call. The calls run concurrently, at most ``max_concurrency`` at a time.
+    Subclasses are built from the tool they wrap and ``max_concurrency``.
+    """
+
+    # Type of the tools that get a batch variant, see with_batch_tools
+    tool_type: type[BaseTool] = BaseTool
+
+    def __init__(
+        self,
+        tool_spec: Optional[ToolSpec],
+        max_concurrency: int = DEFAULT_BATCH_MAX_CONCURRENCY,
+    ):
+        self.max_concurrency = max_concurrency
+        super().__init__(tool_spec)
+
+    @property
+    def is_async(self) -> bool:
+        return True
+
+    def execute(self, **kwargs):
+        return self.run_aexecute(**kwargs)
+
+    async def gather(
+        self, call: Callable[[Any], Awaitable[Any]], items: Sequence
+    ) -> list:
+        """Returns the results of ``call`` for every item, in the order of the items."""
+        limiter = anyio.CapacityLimiter(self.max_concurrency)
+        results: list = [None] * len(items)
+
+        async def run(i: int, item):
+            async with limiter:
+                results[i] = await call(item)
+
+        async with anyio.create_task_group() as tg:
+            for i, item in enumerate(items):
+                tg.start_soon(run, i, item)
+        return results
+
+
+def with_batch_tools(
+    tools: list[BaseTool], batch_tool_type: type[BatchTool], max_concurrency: int
+) -> list[BaseTool]:
+    """
+    Returns the given tools with every tool of ``batch_tool_type.tool_type`` followed
+    by its batch variant.
+    """
+    all_tools = []
+    for tool in tools:
+        all_tools.append(tool)
+        if isinstance(tool, batch_tool_type.tool_type):
+            all_tools.append(batch_tool_type(tool, max_concurrency))
+    return all_tools
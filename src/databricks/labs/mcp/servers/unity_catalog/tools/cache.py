@@ -0,0 +1,81 @@
+"""
+Size-bounded in-memory cache for tool results.
+"""
+
+import collections
+import json
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class ResultCache:
+    """
+    Least recently used cache of tool results. Entries expire after the TTL given when
+    they are stored, and the least recently used entries are evicted once the total
+    (approximate, JSON encoded) size of the cached results exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = 0
+        self._entries: collections.OrderedDict[Hashable, tuple[float, Any, int]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(
+        self, key: Hashable, value: Any, ttl_seconds: float, size: Optional[int] = None
+    ) -> None:
+        """
+        Stores ``value`` under ``key``. ``size`` defaults to the length of the JSON
+        encoded value, values larger than the whole cache are not stored.
+        """
+        if size is None:
+            size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl_seconds, value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drops the entries whose key matches ``predicate``."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
@@ -0,0 +1,171 @@
+"""
+Process-wide Databricks clients shared by all tools.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from databricks.sdk import WorkspaceClient
+from databricks.sdk.config import Config
+from databricks.vector_search.client import VectorSearchClient
+from databricks.vector_search.utils import RequestUtils
+from requests.adapters import HTTPAdapter
+from unitycatalog.ai.core.databricks import DatabricksFunctionClient
+
+from databricks.labs.mcp.metrics import METRICS
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.utils import logger
+
+UPSTREAM_CALL_SECONDS = METRICS.histogram(
+    "mcp_upstream_call_seconds",
+    "Duration of calls to Databricks APIs, retries included, by API",
+    ("api",),
+)
+UPSTREAM_CALL_ERRORS = METRICS.counter(
+    "mcp_upstream_call_errors_total",
+    "Number of calls to Databricks APIs that failed, by API",
+    ("api",),
+)
+
+
+@contextmanager
+def upstream_call(api: str) -> Iterator[None]:
+    """
+    Times the Databricks API call made in the block under the ``api`` label: ``genie``,
+    ``sql`` (statement results), ``vector_search``, ``uc_function`` (function
+    executions) or ``unity_catalog`` (catalog metadata). Calls answered from a cache
+    are not made in such a block, so the metric only measures Databricks.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_CALL_ERRORS.inc(api)
+        raise
+    finally:
+        UPSTREAM_CALL_SECONDS.observe(time.perf_counter() - start_time, api)
+
+
+class ClientRegistry:
+    """
+    Lazily creates one client per API family and reuses it for every tool call, so
+    config resolution, authentication and TLS handshakes are paid once per process
+    and HTTP connections are kept alive in a pool.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        credential_refresh_seconds: int = 1800,
+    ):
+        """Initialize the registry.
+
+        Args:
+            max_connections_per_host: Size of the keep-alive connection pool per host
+            credential_refresh_seconds: Age after which the vector search client,
+                which captures a static token, is rebuilt in the background
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.credential_refresh_seconds = credential_refresh_seconds
+        self._lock = threading.Lock()
+        self._workspace_client: Optional[WorkspaceClient] = None
+        self._function_client: Optional[DatabricksFunctionClient] = None
+        self._vector_search_client: Optional[VectorSearchClient] = None
+        self._vector_search_client_created_at = 0.0
+        self._vector_search_client_refreshing = False
+        self._refresh_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mcp-client-refresh"
+        )
+
+    def get_workspace_client(self) -> WorkspaceClient:
+        with self._lock:
+            if self._workspace_client is None:
+                # OAuth tokens of the SDK client are refreshed asynchronously
+                # before they expire, so no call waits on a token refresh
+                config = Config(
+                    max_connection_pools=self.max_connections_per_host,
+                    max_connections_per_pool=self.max_connections_per_host,
+                    disable_async_token_refresh=False,
+                )
+                self._workspace_client = WorkspaceClient(config=config)
+            return self._workspace_client
+
+    def get_function_client(self) -> DatabricksFunctionClient:
+        workspace_client = self.get_workspace_client()
+        with self._lock:
+            if self._function_client is None:
+                self._function_client = DatabricksFunctionClient(
+                    client=workspace_client
+                )
+            return self._function_client
+
+    def get_vector_search_client(self) -> VectorSearchClient:
+        with self._lock:
+            if self._vector_search_client is None:
+                self._configure_vector_search_pool()
+                self._set_vector_search_client(self._create_vector_search_client())
+            elif self._is_vector_search_client_stale():
+                # Keep serving the current client while a fresh one is built
+                self._vector_search_client_refreshing = True
+                self._refresh_pool.submit(self._refresh_vector_search_client)
+            return self._vector_search_client
+
+    def _is_vector_search_client_stale(self) -> bool:
+        age = time.monotonic() - self._vector_search_client_created_at
+        return (
+            age > self.credential_refresh_seconds
+            and not self._vector_search_client_refreshing
+        )
+
+    def _create_vector_search_client(self) -> VectorSearchClient:
+        return VectorSearchClient(disable_notice=True)
+
+    def _set_vector_search_client(self, client: VectorSearchClient) -> None:
+        self._vector_search_client = client
+        self._vector_search_client_created_at = time.monotonic()
+
+    def _refresh_vector_search_client(self) -> None:
+        try:
+            client = self._create_vector_search_client()
+            with self._lock:
+                self._set_vector_search_client(client)
+        except Exception as e:
+            logger.warning(f"Failed to refresh vector search client credentials: {e}")
+        finally:
+            self._vector_search_client_refreshing = False
+
+    def _configure_vector_search_pool(self) -> None:
+        # The vector search SDK sends all requests through one shared session
+        session = RequestUtils.session
+        adapter = HTTPAdapter(
+            max_retries=session.get_adapter("https://").max_retries,
+            pool_connections=self.max_connections_per_host,
+            pool_maxsize=self.max_connections_per_host,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+
+@lru_cache
+def get_client_registry() -> ClientRegistry:
+    settings = get_settings()
+    return ClientRegistry(
+        max_connections_per_host=settings.max_connections_per_host,
+        credential_refresh_seconds=settings.credential_refresh_seconds,
+    )
+
+
+def get_workspace_client() -> WorkspaceClient:
+    return get_client_registry().get_workspace_client()
+
+
+def get_function_client() -> DatabricksFunctionClient:
+    return get_client_registry().get_function_client()
+
+
+def get_vector_search_client() -> VectorSearchClient:
+    return get_client_registry().get_vector_search_client()
@@ -0,0 +1,270 @@
+"""
+Local columnar copies of full Genie query results, so that large results are fetched
+once and then read slice by slice instead of being passed around as JSON text.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import requests
+from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.sql import (
+    ColumnInfo,
+    ColumnInfoTypeName,
+    Format,
+    ResultData,
+    StatementResponse,
+)
+
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import upstream_call
+from databricks.labs.mcp.utils import logger
+
+# Timeout of the requests fetching result chunks from their presigned URLs
+DOWNLOAD_TIMEOUT_SECONDS = 300
+
+DOWNLOAD_ID_PATTERN = re.compile(r"[\w-]+")
+
+# Arrow types of the JSON_ARRAY values, which are all sent as strings. Values of the
+# other types (dates, decimals, nested types...) are kept as strings.
+ARROW_TYPES = {
+    ColumnInfoTypeName.BOOLEAN: pa.bool_(),
+    ColumnInfoTypeName.BYTE: pa.int8(),
+    ColumnInfoTypeName.SHORT: pa.int16(),
+    ColumnInfoTypeName.INT: pa.int32(),
+    ColumnInfoTypeName.LONG: pa.int64(),
+    ColumnInfoTypeName.FLOAT: pa.float32(),
+    ColumnInfoTypeName.DOUBLE: pa.float64(),
+}
+
+
+def _get_arrow_schema(columns: list[ColumnInfo]) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field(column.name, ARROW_TYPES.get(column.type_name, pa.string()))
+            for column in columns
+        ]
+    )
+
+
+def _json_rows_to_batch(rows: list[list], schema: pa.Schema) -> pa.RecordBatch:
+    arrays = [
+        pa.array([row[i] for row in rows], pa.string()).cast(field.type)
+        for i, field in enumerate(schema)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _iter_chunk_batches(
+    chunk: ResultData, result_format: Optional[Format], schema: pa.Schema
+) -> Iterator[pa.RecordBatch]:
+    if chunk.data_array is not None:
+        if chunk.data_array:
+            yield _json_rows_to_batch(chunk.data_array, schema)
+        return
+    for link in chunk.external_links or []:
+        # Presigned URLs, the workspace credentials must not be sent along
+        with requests.get(
+            link.external_link,
+            headers=link.http_headers,
+            stream=True,
+            timeout=DOWNLOAD_TIMEOUT_SECONDS,
+        ) as response:
+            response.raise_for_status()
+            if result_format == Format.ARROW_STREAM:
+                response.raw.decode_content = True
+                yield from pa.ipc.open_stream(response.raw)
+            elif result_format == Format.JSON_ARRAY:
+                rows = json.loads(response.content)
+                if rows:
+                    yield _json_rows_to_batch(rows, schema)
+            else:
+                raise ValueError(f"Unsupported query result format: {result_format}")
+
+
+def iter_result_batches(
+    client: WorkspaceClient, statement: StatementResponse
+) -> Iterator[pa.RecordBatch]:
+    """
+    Yields the record batches of a statement result, fetching one chunk at a time so
+    that memory use does not depend on the size of the result.
+    """
+    manifest = statement.manifest
+    schema = _get_arrow_schema(
+        (manifest.schema.columns or []) if manifest and manifest.schema else []
+    )
+    result_format = manifest.format if manifest else None
+    chunk = statement.result
+    while chunk is not None:
+        yield from _iter_chunk_batches(chunk, result_format, schema)
+        if chunk.next_chunk_index is None:
+            return
+        with upstream_call("sql"):
+            chunk = client.statement_execution.get_statement_result_chunk_n(
+                statement.statement_id, chunk.next_chunk_index
+            )
+
+
+class ColumnStatistics:
+    """Statistics of a column, accumulated batch by batch."""
+
+    def __init__(self, field: pa.Field):
+        self.field = field
+        self.null_count = 0
+        self.min: Any = None
+        self.max: Any = None
+
+    def update(self, array: pa.Array) -> None:
+        self.null_count += array.null_count
+        try:
+            min_max = pc.min_max(array)
+        except (pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            # No ordering for the type, e.g. nested types
+            return
+        batch_min, batch_max = min_max["min"].as_py(), min_max["max"].as_py()
+        if batch_min is not None and (self.min is None or batch_min < self.min):
+            self.min = batch_min
+        if batch_max is not None and (self.max is None or batch_max > self.max):
+            self.max = batch_max
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.field.name,
+            "type": str(self.field.type),
+            "null_count": self.null_count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class DownloadStore:
+    """
+    Stores full query results as Arrow IPC files in a local directory. Results are
+    written batch by batch and read back through memory maps, so only the slices that
+    are actually read are loaded into memory.
+
+    Downloads not read for ``retention_seconds`` are deleted, and the least recently
+    read downloads are deleted when the directory grows beyond ``max_bytes``. Both
+    bounds are applied whenever a download is written, 0 disables a bound.
+    """
+
+    def __init__(
+        self, directory: Path, retention_seconds: float = 0, max_bytes: int = 0
+    ):
+        self.directory = directory
+        self.retention_seconds = retention_seconds
+        self.max_bytes = max_bytes
+
+    def get_path(self, download_id: str) -> Path:
+        if not DOWNLOAD_ID_PATTERN.fullmatch(download_id):
+            raise ValueError(f"Invalid download ID: {download_id}")
+        return self.directory / f"{download_id}.arrow"
+
+    def write(self, download_id: str, batches: Iterator[pa.RecordBatch]) -> dict:
+        """Writes the batches to the file of the download, returns its summary."""
+        path = self.get_path(download_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        first_batch = next(batches, None)
+        schema = first_batch.schema if first_batch is not None else pa.schema([])
+        statistics = [ColumnStatistics(field) for field in schema]
+        row_count = 0
+        # Written to a temporary file first, so readers never see a partial result
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, schema) as writer:
+                batch = first_batch
+                while batch is not None:
+                    writer.write_batch(batch)
+                    row_count += batch.num_rows
+                    for column_statistics, array in zip(statistics, batch.columns):
+                        column_statistics.update(array)
+                    batch = next(batches, None)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.cleanup(keep=path)
+        return {
+            "download_id": download_id,
+            "path": str(path),
+            "row_count": row_count,
+            "byte_size": path.stat().st_size,
+            "columns": [column.to_dict() for column in statistics],
+        }
+
+    def read(
+        self,
+        download_id: str,
+        row_offset: int,
+        row_limit: int,
+        columns: Optional[list[str]] = None,
+    ) -> dict:
+        """Returns a slice of the rows of a download, as value arrays."""
+        path = self.get_path(download_id)
+        try:
+            # The modification time tracks the last read, see cleanup
+            os.utime(path)
+            source = pa.memory_map(str(path))
+        except FileNotFoundError:
+            raise ValueError(
+                f"Download {download_id} was not fetched or has expired, call "
+                f"genie_fetch_download first"
+            ) from None
+        with source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns:
+                table = table.select(columns)
+            rows_slice = table.slice(row_offset, row_limit)
+            rows = [list(row.values()) for row in rows_slice.to_pylist()]
+            return {
+                "download_id": download_id,
+                "columns": table.column_names,
+                "row_count": table.num_rows,
+                "row_offset": row_offset,
+                "rows": rows,
+            }
+
+    def cleanup(self, keep: Optional[Path] = None) -> None:
+        """Deletes the downloads beyond the retention and size bounds of the store."""
+        entries = []
+        for path in self.directory.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        # Least recently read first
+        entries.sort(key=lambda entry: entry[0])
+        total_bytes = sum(size for _, size, _ in entries)
+        expired_before = time.time() - self.retention_seconds
+        for mtime, size, path in entries:
+            expired = self.retention_seconds and mtime < expired_before
+            over_budget = self.max_bytes and total_bytes > self.max_bytes
+            if path == keep or not (expired or over_budget):
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to delete download {path}: {e}")
+                continue
+            total_bytes -= size
+
+
+@lru_cache
+def get_download_store() -> DownloadStore:
+    settings = get_settings()
+    return DownloadStore(
+        Path(settings.genie_download_dir),
+        retention_seconds=settings.genie_download_retention_seconds,
+        max_bytes=settings.genie_download_max_bytes,
+    )
@@ -0,0 +1,218 @@
+"""
+Bounded worker pool for running blocking tool executions off the event loop.
+"""
+
+import copy
+import functools
+import json
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+import anyio
+from anyio import CapacityLimiter
+
+from databricks.labs.mcp.metrics import METRICS
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.utils import logger
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+TOOL_CALL_SECONDS = METRICS.histogram(
+    "mcp_tool_call_seconds", "Duration of tool calls", ("tool",)
+)
+TOOL_CALL_ERRORS = METRICS.counter(
+    "mcp_tool_call_errors_total", "Number of tool calls that failed", ("tool",)
+)
+# Everything run in a worker thread, cache lookups included. Calls to Databricks
+# are timed separately, see clients.upstream_call.
+WORKER_CALL_SECONDS = METRICS.histogram(
+    "mcp_worker_call_seconds",
+    "Duration of blocking calls run in the worker pool, by tool family",
+    ("family",),
+)
+WORKER_CALL_ERRORS = METRICS.counter(
+    "mcp_worker_call_errors_total",
+    "Number of blocking calls run in the worker pool that failed, by tool family",
+    ("family",),
+)
+
+
+class _Call:
+    def __init__(self):
+        self.done = anyio.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Returns a copy of ``error`` without its traceback, to be raised again."""
+    try:
+        return copy.copy(error).with_traceback(None)
+    except Exception:
+        # The exception cannot be rebuilt from its arguments
+        return RuntimeError(str(error))
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call is in flight for a key, calls
+    with the same key wait for it and share its result (or exception) instead of
+    running again. Calls are only shared while in flight, nothing is cached.
+    """
+
+    def __init__(self):
+        self.coalesced_calls = 0
+        self._calls: dict[Hashable, _Call] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+            self.coalesced_calls += 1
+            await call.done.wait()
+            if not call.cancelled:
+                if call.error is not None:
+                    # Raising the shared exception would add the frames of every
+                    # waiter to its traceback
+                    raise _copy_error(call.error) from call.error
+                return call.result
+            # The call we waited for was cancelled with its request, run it ourselves
+
+        call = self._calls[key] = _Call()
+        try:
+            call.result = await func()
+            return call.result
+        except anyio.get_cancelled_exc_class():
+            call.cancelled = True
+            raise
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            del self._calls[key]
+            call.done.set()
+
+
+def _get_call_key(tool: BaseTool, arguments: dict) -> Optional[Hashable]:
+    """Returns a key identifying equivalent calls, None if the call must not be shared."""
+    if not tool.coalesce_calls:
+        return None
+    try:
+        canonical_arguments = json.dumps(
+            arguments, sort_keys=True, separators=(",", ":")
+        )
+    except (TypeError, ValueError):
+        return None
+    # Tool objects are swapped on catalog refresh, calls to different definitions
+    # of the same tool are not shared
+    return id(tool), canonical_arguments
+
+
+class ToolExecutor:
+    """
+    Runs synchronous tool code in worker threads, with a separate concurrency limit
+    per tool family. A slow family (e.g. Genie) can only exhaust its own slots, so it
+    never stalls calls belonging to other families or the event loop itself.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int],
+        default_limit: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """Initialize the executor.
+
+        Args:
+            limits: Maximum number of concurrent executions per tool family
+            default_limit: Limit used for families missing from ``limits``
+        """
+        self.default_limit = default_limit
+        self.single_flight = SingleFlight()
+        self._limiters: dict[str, CapacityLimiter] = {
+            family: CapacityLimiter(limit) for family, limit in limits.items()
+        }
+
+    def get_limiter(self, family: str) -> CapacityLimiter:
+        if family not in self._limiters:
+            self._limiters[family] = CapacityLimiter(self.default_limit)
+        return self._limiters[family]
+
+    async def run_sync(self, family: str, func: Callable[..., T], *args: Any) -> T:
+        """Runs ``func`` in a worker thread, waiting for a free slot of ``family``.
+
+        Keyword arguments are not accepted, so that tool arguments named ``family``
+        or ``func`` cannot clash with this signature: bind them with
+        ``functools.partial`` instead.
+        """
+        limiter = self.get_limiter(family)
+        if limiter.available_tokens == 0:
+            logger.debug(
+                f"All {limiter.total_tokens} '{family}' workers are busy, "
+                f"{limiter.statistics().tasks_waiting} call(s) already queued"
+            )
+
+        def timed_func() -> T:
+            # Timed in the worker thread, waiting for a slot is not counted
+            start_time = time.perf_counter()
+            try:
+                return func(*args)
+            except Exception:
+                WORKER_CALL_ERRORS.inc(family)
+                raise
+            finally:
+                WORKER_CALL_SECONDS.observe(time.perf_counter() - start_time, family)
+
+        return await anyio.to_thread.run_sync(timed_func, limiter=limiter)
+
+    async def execute(self, tool: BaseTool, arguments: dict):
+        start_time = time.perf_counter()
+        try:
+            key = _get_call_key(tool, arguments)
+            if key is None:
+                return await self._execute(tool, arguments)
+            return await self.single_flight.run(
+                key, functools.partial(self._execute, tool, arguments)
+            )
+        except Exception:
+            TOOL_CALL_ERRORS.inc(tool.name)
+            raise
+        finally:
+            TOOL_CALL_SECONDS.observe(time.perf_counter() - start_time, tool.name)
+
+    async def _execute(self, tool: BaseTool, arguments: dict):
+        if tool.is_async:
+            # Async tools offload their own blocking calls through run_sync
+            return await tool.aexecute(**arguments)
+        return await self.run_sync(
+            tool.family, functools.partial(tool.execute, **arguments)
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns the limit, in-flight and queued call counts for every tool family."""
+        stats = {}
+        for family, limiter in self._limiters.items():
+            statistics = limiter.statistics()
+            stats[family] = {
+                "limit": int(statistics.total_tokens),
+                "in_flight": statistics.borrowed_tokens,
+                "queued": statistics.tasks_waiting,
+            }
+        return stats
+
+
+@lru_cache
+def get_tool_executor() -> ToolExecutor:
+    settings = get_settings()
+    return ToolExecutor(
+        limits={
+            "genie": settings.genie_max_concurrency,
+            "vector_search": settings.vector_search_max_concurrency,
+            "uc_function": settings.uc_function_max_concurrency,
+        }
+    )
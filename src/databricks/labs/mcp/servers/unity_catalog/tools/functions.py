@@ -1,58 +1,366 @@
+import fnmatch
+import functools
+import json
 import logging
+import threading
+from functools import lru_cache
+from typing import Optional
 
 from mcp.types import Tool as ToolSpec, TextContent
-from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import (
+    DEFAULT_BATCH_MAX_CONCURRENCY,
+    BaseTool,
+    BatchTool,
+    get_bounded_tool_name,
+    with_batch_tools as with_tool_batch_tools,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.cache import ResultCache
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    get_function_client,
+    upstream_call,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import get_tool_executor
+from databricks.sdk.service.catalog import FunctionInfo
 from unitycatalog.ai.core.databricks import DatabricksFunctionClient
+from unitycatalog.ai.core.utils.function_processing_utils import get_tool_name
 from databricks_openai import UCFunctionToolkit
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of parameter sets of one batch function call
+MAX_BATCH_CALLS = 64
+# Keywords under which JSON schemas of function parameters define nested types
+SCHEMA_DEFINITIONS_KEYS = ("$defs", "definitions")
+
+# Cache key of a function result: function full name and canonical JSON parameters
+FunctionResultKey = tuple[str, str]
+
+
+class FunctionResultCache(ResultCache):
+    """Cache of the results of deterministic UC functions."""
+
+    @staticmethod
+    def make_key(function_name: str, parameters: dict) -> FunctionResultKey:
+        return function_name, json.dumps(parameters, sort_keys=True, default=str)
+
+    def invalidate_function(self, function_name: str) -> None:
+        self.invalidate(lambda key: key[0] == function_name)
+
+
+@lru_cache
+def get_function_result_cache() -> FunctionResultCache:
+    return FunctionResultCache(get_settings().uc_function_result_cache_max_bytes)
+
+
+def _get_function_result_cache_ttl_seconds(
+    function_name: str, ttl_seconds: float, ttl_overrides: list[str]
+) -> float:
+    """
+    Returns how long results of the function are cached, 0 if they are not cached.
+    The first ``pattern=seconds`` override matching the function name wins.
+    """
+    for override in ttl_overrides:
+        pattern, _, override_ttl_seconds = override.rpartition("=")
+        if fnmatch.fnmatchcase(function_name, pattern):
+            return float(override_ttl_seconds)
+    return ttl_seconds
+
 
 class UCFunctionTool(BaseTool):
-    def __init__(self, tool_obj, client: DatabricksFunctionClient, uc_function_name):
+    family = "uc_function"
+
+    def __init__(
+        self,
+        tool_obj,
+        client: DatabricksFunctionClient,
+        uc_function_name,
+        updated_at: Optional[int] = None,
+        is_deterministic: bool = False,
+        result_cache_ttl_seconds: float = 0,
+    ):
+        """
+        ``tool_obj`` may be None, the function definition is then only fetched from UC
+        when the tool spec is first needed, e.g. when a tools/list page includes it.
+        Results of deterministic functions are cached for ``result_cache_ttl_seconds``.
+        """
         self.tool_obj = tool_obj
         self.client = client
         self.uc_function_name = uc_function_name
-        tool_info = tool_obj["function"]
-        llm_friendly_tool_name = tool_info["name"]
-        tool_spec = ToolSpec(
-            name=llm_friendly_tool_name,
-            description=tool_info["description"],
-            inputSchema=tool_info["parameters"],
+        # Update time of the UC function, used to skip unchanged functions on refresh
+        self.updated_at = updated_at
+        self.is_deterministic = is_deterministic
+        self.result_cache_ttl_seconds = (
+            result_cache_ttl_seconds if is_deterministic else 0
         )
-        super().__init__(tool_spec=tool_spec)
+        # Non-deterministic functions may have side effects, every call of them is
+        # executed. Identical concurrent calls of a deterministic function share one.
+        self.coalesce_calls = is_deterministic
+        self._lock = threading.Lock()
+        super().__init__(tool_spec=None)
 
-    def execute(self, **kwargs) -> list[TextContent]:
-        res = self.client.execute_function(
-            function_name=self.uc_function_name, parameters=kwargs
+    @property
+    def name(self) -> str:
+        if self.tool_obj is not None:
+            return self.tool_obj["function"]["name"]
+        return get_tool_name(self.uc_function_name)
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        if self._tool_spec is None:
+            with self._lock:
+                if self.tool_obj is None:
+                    with upstream_call("unity_catalog"):
+                        toolkit = UCFunctionToolkit(
+                            client=self.client, function_names=[self.uc_function_name]
+                        )
+                    self.tool_obj = toolkit.tools_dict[self.uc_function_name]
+                tool_info = self.tool_obj["function"]
+                self._tool_spec = ToolSpec(
+                    name=tool_info["name"],
+                    description=tool_info["description"],
+                    inputSchema=tool_info["parameters"],
+                )
+        return self._tool_spec
+
+    def has_same_definition(self, other: BaseTool) -> bool:
+        # Compare update times when known, so that unfetched specs stay unfetched
+        if (
+            isinstance(other, UCFunctionTool)
+            and self.updated_at is not None
+            and self.uc_function_name == other.uc_function_name
+            and self.updated_at == other.updated_at
+        ):
+            return True
+        return super().has_same_definition(other)
+
+    def to_snapshot(self) -> dict:
+        return {
+            "uc_function_name": self.uc_function_name,
+            "tool_obj": self.tool_obj,
+            "updated_at": self.updated_at,
+            "is_deterministic": self.is_deterministic,
+        }
+
+    @classmethod
+    def from_snapshot(
+        cls, data: dict, client: DatabricksFunctionClient, settings
+    ) -> "UCFunctionTool":
+        return cls(
+            data["tool_obj"],
+            client,
+            data["uc_function_name"],
+            data["updated_at"],
+            data.get("is_deterministic", False),
+            _get_function_result_cache_ttl_seconds(
+                data["uc_function_name"],
+                settings.uc_function_result_cache_ttl_seconds,
+                settings.uc_function_result_cache_ttl_overrides,
+            ),
         )
+
+    def _execute_function(self, parameters: dict) -> str:
+        with upstream_call("uc_function"):
+            res = self.client.execute_function(
+                function_name=self.uc_function_name, parameters=parameters
+            )
         if res.error:
             raise Exception(
                 f"Error while executing {self.uc_function_name}: {res.error}"
             )
+        return res.value
+
+    def execute(self, **kwargs) -> list[TextContent]:
+        if not self.result_cache_ttl_seconds:
+            value = self._execute_function(kwargs)
+        else:
+            cache = get_function_result_cache()
+            key = cache.make_key(self.uc_function_name, kwargs)
+            value = cache.get(key)
+            if value is None:
+                # Errors are raised, only successful results are cached
+                value = self._execute_function(kwargs)
+                cache.put(key, value, self.result_cache_ttl_seconds)
         return [
             TextContent(
                 type="text",
-                text=res.value,
+                text=value,
             )
         ]
 
 
+class UCFunctionBatchTool(BatchTool):
+    """
+    Executes the function of a UC function tool once per parameter set in one call.
+    The executions run concurrently in the UC function worker pool, and a failing
+    execution does not fail the others.
+    """
+
+    family = "uc_function"
+    coalesce_calls = False
+    tool_type = UCFunctionTool
+
+    def __init__(
+        self,
+        function_tool: UCFunctionTool,
+        max_concurrency: int = DEFAULT_BATCH_MAX_CONCURRENCY,
+    ):
+        self.function_tool = function_tool
+        super().__init__(tool_spec=None, max_concurrency=max_concurrency)
+
+    @property
+    def name(self) -> str:
+        return get_bounded_tool_name(f"{self.function_tool.name}_batch")
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        # Built from the spec of the function tool, which is itself fetched lazily
+        if self._tool_spec is None:
+            function_spec = self.function_tool.tool_spec
+            # References such as "#/$defs/..." resolve against the schema root, so the
+            # definitions of the function schema move up to the batch schema
+            items_schema = dict(function_spec.inputSchema)
+            definitions = {
+                key: items_schema.pop(key)
+                for key in SCHEMA_DEFINITIONS_KEYS
+                if key in items_schema
+            }
+            self._tool_spec = ToolSpec(
+                name=self.name,
+                description=f"Runs the function `{self.function_tool.uc_function_name}` "
+                f"once per parameter set, results are returned in order. "
+                f"{function_spec.description}",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "items": items_schema,
+                            "minItems": 1,
+                            "maxItems": MAX_BATCH_CALLS,
+                            "description": "Parameters of every function call",
+                        }
+                    },
+                    "required": ["calls"],
+                    **definitions,
+                },
+            )
+        return self._tool_spec
+
+    def has_same_definition(self, other: BaseTool) -> bool:
+        return isinstance(
+            other, UCFunctionBatchTool
+        ) and self.function_tool.has_same_definition(other.function_tool)
+
+    async def aexecute(self, calls: list[dict]) -> list[TextContent]:
+        if not 1 <= len(calls) <= MAX_BATCH_CALLS:
+            raise ValueError(
+                f"Expected between 1 and {MAX_BATCH_CALLS} calls, got {len(calls)}"
+            )
+        executor = get_tool_executor()
+
+        async def call(parameters: dict) -> dict:
+            try:
+                content = await executor.run_sync(
+                    self.family,
+                    functools.partial(self.function_tool.execute, **parameters),
+                )
+                return {"value": content[0].text}
+            except Exception as e:
+                return {"error": str(e)}
+
+        results = await self.gather(call, calls)
+        return [TextContent(type="text", text=json.dumps(results, default=str))]
+
+
+def with_batch_tools(tools: list[BaseTool], settings) -> list[BaseTool]:
+    """
+    Returns the given tools with every UC function tool followed by its batch
+    variant, if batch tools are enabled.
+    """
+    if not settings.uc_function_batch_tools:
+        return list(tools)
+    return with_tool_batch_tools(
+        tools, UCFunctionBatchTool, settings.uc_function_batch_max_concurrency
+    )
+
+
+def _list_functions(
+    client: DatabricksFunctionClient, catalog_name: str, schema_name: str
+) -> dict[str, FunctionInfo]:
+    """Returns the functions in the schema by full name."""
+    functions_by_name = {}
+    page_token = None
+    while True:
+        with upstream_call("unity_catalog"):
+            functions = client.list_functions(
+                catalog=catalog_name,
+                schema=schema_name,
+                page_token=page_token,
+                # functions with BROWSE permission only cannot be executed
+                include_browse=False,
+            )
+        for f in functions:
+            functions_by_name[f.full_name] = f
+        page_token = functions.token
+        if not page_token:
+            return functions_by_name
+
+
 def _list_uc_function_tools(
     client: DatabricksFunctionClient,
     catalog_name: str,
     schema_name: str,
+    previous_tools: Optional[list[UCFunctionTool]] = None,
+    result_cache_ttl_seconds: float = 0,
+    result_cache_ttl_overrides: Optional[list[str]] = None,
 ) -> list[UCFunctionTool]:
-    toolkit = UCFunctionToolkit(
-        client=client, function_names=[f"{catalog_name}.{schema_name}.*"]
-    )
-    return [
-        UCFunctionTool(tool_obj, client, name)
-        for name, tool_obj in toolkit.tools_dict.items()
-    ]
+    functions_by_name = _list_functions(client, catalog_name, schema_name)
+    previous_tools_by_name = {
+        tool.uc_function_name: tool for tool in previous_tools or []
+    }
+
+    # Function definitions are only fetched once their tool spec is needed, see
+    # UCFunctionTool.tool_spec. Functions that did not change since the previous
+    # discovery are reused as is, together with their already fetched definition.
+    def get_tool(function_name: str) -> UCFunctionTool:
+        function_info = functions_by_name[function_name]
+        updated_at = getattr(function_info, "updated_at", None)
+        previous_tool = previous_tools_by_name.get(function_name)
+        if (
+            previous_tool is not None
+            and updated_at is not None
+            and previous_tool.updated_at == updated_at
+        ):
+            return previous_tool
+        return UCFunctionTool(
+            None,
+            client,
+            function_name,
+            updated_at,
+            is_deterministic=bool(getattr(function_info, "is_deterministic", False)),
+            result_cache_ttl_seconds=_get_function_result_cache_ttl_seconds(
+                function_name,
+                result_cache_ttl_seconds,
+                result_cache_ttl_overrides or [],
+            ),
+        )
+
+    return [get_tool(function_name) for function_name in functions_by_name]
 
 
-def list_uc_function_tools(settings) -> list[UCFunctionTool]:
-    catalog_name, schema_name = settings.schema_full_name.split(".")
-    client = DatabricksFunctionClient()
-    return _list_uc_function_tools(client, catalog_name, schema_name)
+def list_uc_function_tools(
+    settings,
+    schema_full_name: str,
+    previous_tools: Optional[list[UCFunctionTool]] = None,
+) -> list[UCFunctionTool]:
+    catalog_name, schema_name = schema_full_name.split(".")
+    client = get_function_client()
+    return _list_uc_function_tools(
+        client,
+        catalog_name,
+        schema_name,
+        previous_tools,
+        settings.uc_function_result_cache_ttl_seconds,
+        settings.uc_function_result_cache_ttl_overrides,
+    )
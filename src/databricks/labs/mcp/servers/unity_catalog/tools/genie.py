@@ -1,19 +1,44 @@
+import base64
+import binascii
 import functools
+import inspect
 import time
 import json
 import logging
-from typing import Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Literal, Optional, Union
+
+import anyio
 from pydantic import BaseModel, Field
 from pydantic.json import pydantic_encoder
 
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.dashboards import GenieMessage, Wait
+from databricks.sdk.service.sql import ResultData, StatementResponse, StatementState
+from mcp.server.lowlevel.server import request_ctx
 from mcp.types import TextContent, Tool as ToolSpec
 
+from databricks.labs.mcp.servers.unity_catalog.cli import get_settings
 from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.servers.unity_catalog.tools.cache import ResultCache
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    get_workspace_client,
+    upstream_call,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.downloads import (
+    get_download_store,
+    iter_result_batches,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import get_tool_executor
 
 # Logger
 LOGGER = logging.getLogger(__name__)
 
+DEFAULT_QUERY_RESULT_ROW_LIMIT = 1000
+MAX_QUERY_RESULT_ROW_LIMIT = 10000
+
 
 def dump_json(maybe_model: Union[BaseModel, list, dict, None]) -> str:
     if maybe_model is None:
@@ -44,43 +69,284 @@ class GetMessageInput(BaseModel):
     message_id: str
 
 
-class GetAttachmentQueryResultInput(BaseModel):
+class AttachmentInput(BaseModel):
     space_id: str
     conversation_id: str
     message_id: str
     attachment_id: str
 
 
+class GetAttachmentQueryResultInput(AttachmentInput):
+    row_offset: int = Field(
+        default=0, ge=0, description="Index of the first result row to return."
+    )
+    row_limit: int = Field(
+        default=DEFAULT_QUERY_RESULT_ROW_LIMIT,
+        ge=1,
+        le=MAX_QUERY_RESULT_ROW_LIMIT,
+        description="Maximum number of rows to return. Further rows are fetched with "
+        "genie_get_query_result_page and the returned next_page_token.",
+    )
+
+
 class ExecuteAttachmentQueryInput(GetAttachmentQueryResultInput):
     pass
 
 
+class GetQueryResultPageInput(BaseModel):
+    page_token: str = Field(
+        ..., description="The next_page_token returned with the previous page."
+    )
+
+
 class GetSpaceInput(BaseModel):
     space_id: str
 
 
-class GenerateDownloadInput(GetAttachmentQueryResultInput):
+class GenerateDownloadInput(AttachmentInput):
     pass
 
 
+class FetchDownloadInput(AttachmentInput):
+    download_id: str = Field(
+        ..., description="The download_id returned by genie_generate_download."
+    )
+
+
+class ReadDownloadInput(BaseModel):
+    download_id: str
+    row_offset: int = Field(default=0, ge=0)
+    row_limit: int = Field(
+        default=DEFAULT_QUERY_RESULT_ROW_LIMIT, ge=1, le=MAX_QUERY_RESULT_ROW_LIMIT
+    )
+    columns: Optional[list[str]] = Field(
+        default=None, description="Columns to return, defaults to all columns."
+    )
+
+
 class PollMessageUntilCompleteInput(BaseModel):
     space_id: str
     conversation_id: str
     message_id: str
     timeout_seconds: int = Field(default=600)
-    poll_interval_seconds: int = Field(default=5)
+    poll_interval_seconds: float = Field(
+        default=5,
+        description="Maximum delay between two polls. Polling starts faster and "
+        "backs off towards this value while the message status does not change.",
+    )
+    initial_poll_interval_seconds: float = Field(
+        default=0.5,
+        description="Delay before the first poll and after every status change.",
+    )
 
 
 class ListSpacesInput(BaseModel):
     pass
 
 
+class AskSpacesInput(BaseModel):
+    content: str = Field(..., description="The question to ask.")
+    space_ids: Optional[list[str]] = Field(
+        default=None,
+        description="The Genie spaces to ask, defaults to all available spaces.",
+    )
+    mode: Literal["first", "all"] = Field(
+        default="first",
+        description="'first' returns as soon as one space answers the question and "
+        "stops waiting for the others, 'all' waits for every space to answer.",
+    )
+    timeout_seconds: float = Field(
+        default=120, gt=0, description="Time after which spaces are not waited for."
+    )
+
+
+# --- Result Cache ---
+
+# Statuses after which a Genie message will not change anymore
+TERMINAL_MESSAGE_STATUSES = {"COMPLETED", "FAILED", "QUERY_RESULT_EXPIRED", "CANCELLED"}
+
+
+def _get_size(value) -> int:
+    return len(json.dumps(value.as_dict(), default=str))
+
+
+class GenieResultCache(ResultCache):
+    """
+    Caches the Genie messages and attachment query results that will not change
+    anymore: messages in a terminal status and successful query results. Re-runs of
+    an attachment query are only served from the cache within the staleness window.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        execute_query_staleness_seconds: float = 0,
+    ):
+        super().__init__(max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.execute_query_staleness_seconds = execute_query_staleness_seconds
+
+    def get_message(
+        self, client: WorkspaceClient, space_id, conversation_id, message_id
+    ) -> GenieMessage:
+        key = ("message", space_id, conversation_id, message_id)
+        message = self.get(key) if self.ttl_seconds else None
+        if message is None:
+            with upstream_call("genie"):
+                message = client.genie.get_message(
+                    space_id, conversation_id, message_id
+                )
+            status = message.status.value if message.status else None
+            if self.ttl_seconds and status in TERMINAL_MESSAGE_STATUSES:
+                self.put(key, message, self.ttl_seconds, _get_size(message))
+        return message
+
+    def _put_query_result(self, key, statement: Optional[StatementResponse], ttl):
+        state = statement.status.state if statement and statement.status else None
+        if ttl and state == StatementState.SUCCEEDED:
+            self.put(key, statement, ttl, _get_size(statement))
+
+    def get_query_result(
+        self, client: WorkspaceClient, model: AttachmentInput
+    ) -> Optional[StatementResponse]:
+        key = ("query_result", *_attachment_key(model))
+        statement = self.get(key) if self.ttl_seconds else None
+        if statement is None:
+            with upstream_call("genie"):
+                statement = client.genie.get_message_attachment_query_result(
+                    *_attachment_key(model)
+                ).statement_response
+            self._put_query_result(key, statement, self.ttl_seconds)
+        return statement
+
+    def execute_query(
+        self, client: WorkspaceClient, model: AttachmentInput
+    ) -> Optional[StatementResponse]:
+        key = ("execution", *_attachment_key(model))
+        statement = self.get(key) if self.execute_query_staleness_seconds else None
+        if statement is None:
+            with upstream_call("genie"):
+                statement = client.genie.execute_message_attachment_query(
+                    *_attachment_key(model)
+                ).statement_response
+            self._put_query_result(key, statement, self.execute_query_staleness_seconds)
+            # The new result replaces the previous result of the attachment
+            self._put_query_result(
+                ("query_result", *_attachment_key(model)), statement, self.ttl_seconds
+            )
+        return statement
+
+
+def _attachment_key(model: AttachmentInput) -> tuple[str, str, str, str]:
+    return (
+        model.space_id,
+        model.conversation_id,
+        model.message_id,
+        model.attachment_id,
+    )
+
+
+@lru_cache
+def get_genie_result_cache() -> GenieResultCache:
+    settings = get_settings()
+    return GenieResultCache(
+        settings.genie_result_cache_max_bytes,
+        settings.genie_result_cache_ttl_seconds,
+        settings.genie_execute_query_staleness_seconds,
+    )
+
+
+class SpaceCache:
+    """
+    Caches the metadata of Genie spaces. Spaces missing from the cache are fetched
+    concurrently. Entries older than the TTL are still served, while they are fetched
+    again in the background, so listing known spaces never waits on the API.
+    """
+
+    def __init__(self, ttl_seconds: float, max_concurrency: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, dict]] = {}
+        self._refreshing: set[str] = set()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="mcp-genie-spaces"
+        )
+
+    def _fetch(self, client: WorkspaceClient, space_id: str) -> dict:
+        with upstream_call("genie"):
+            space = client.genie.get_space(space_id)
+        info = {
+            "space_id": space_id,
+            "title": space.title,
+            "description": getattr(space, "description", None),
+        }
+        if self.ttl_seconds:
+            with self._lock:
+                self._entries[space_id] = (time.monotonic(), info)
+        return info
+
+    def _refresh(self, client: WorkspaceClient, space_id: str) -> None:
+        try:
+            self._fetch(client, space_id)
+        except Exception as e:
+            LOGGER.warning(f"Failed to refresh Genie space {space_id}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(space_id)
+
+    def _get_cached(self, client: WorkspaceClient, space_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(space_id)
+            if entry is None:
+                return None
+            fetched_at, info = entry
+            if (
+                time.monotonic() - fetched_at > self.ttl_seconds
+                and space_id not in self._refreshing
+            ):
+                self._refreshing.add(space_id)
+                self._pool.submit(self._refresh, client, space_id)
+        return info
+
+    def get_space(self, client: WorkspaceClient, space_id: str) -> dict:
+        return self._get_cached(client, space_id) or self._fetch(client, space_id)
+
+    def get_spaces(self, client: WorkspaceClient, space_ids: list[str]) -> list[dict]:
+        """Returns the metadata of the spaces, or the error that prevented fetching it."""
+        spaces = {
+            space_id: self._get_cached(client, space_id) for space_id in space_ids
+        }
+        missing_space_ids = [space_id for space_id, info in spaces.items() if not info]
+        futures = {
+            space_id: self._pool.submit(self._fetch, client, space_id)
+            for space_id in missing_space_ids
+        }
+        for space_id, future in futures.items():
+            try:
+                spaces[space_id] = future.result()
+            except Exception as e:
+                spaces[space_id] = {"space_id": space_id, "error": str(e)}
+        return [spaces[space_id] for space_id in space_ids]
+
+
+@lru_cache
+def get_space_cache() -> SpaceCache:
+    settings = get_settings()
+    return SpaceCache(
+        settings.genie_space_cache_ttl_seconds, settings.genie_max_concurrency
+    )
+
+
 # --- Tool Implementations ---
 
 
 def _start_conversation(client: WorkspaceClient, args) -> list[TextContent]:
     model = StartConversationInput.model_validate(args)
-    message = client.genie.start_conversation_and_wait(model.space_id, model.content)
+    with upstream_call("genie"):
+        message = client.genie.start_conversation_and_wait(
+            model.space_id, model.content
+        )
     return [
         TextContent(
             type="text",
@@ -99,9 +365,10 @@ def _start_conversation(client: WorkspaceClient, args) -> list[TextContent]:
 
 def _create_message(client: WorkspaceClient, args) -> list[TextContent]:
     model = CreateMessageInput.model_validate(args)
-    message = client.genie.create_message_and_wait(
-        model.space_id, model.conversation_id, model.content
-    )
+    with upstream_call("genie"):
+        message = client.genie.create_message_and_wait(
+            model.space_id, model.conversation_id, model.content
+        )
     return [
         TextContent(
             type="text",
@@ -120,8 +387,8 @@ def _create_message(client: WorkspaceClient, args) -> list[TextContent]:
 
 def _get_message(client: WorkspaceClient, args) -> list[TextContent]:
     model = GetMessageInput.model_validate(args)
-    message = client.genie.get_message(
-        model.space_id, model.conversation_id, model.message_id
+    message = get_genie_result_cache().get_message(
+        client, model.space_id, model.conversation_id, model.message_id
     )
     return [
         TextContent(
@@ -141,35 +408,162 @@ def _get_message(client: WorkspaceClient, args) -> list[TextContent]:
     ]
 
 
+def _encode_page_token(
+    statement_id: str, row_offset: int, chunk_index: int, row_limit: int
+) -> str:
+    token = {"s": statement_id, "o": row_offset, "c": chunk_index, "l": row_limit}
+    return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+
+
+def _decode_page_token(page_token: str) -> dict:
+    try:
+        token = json.loads(base64.urlsafe_b64decode(page_token.encode()))
+        token = {"s": str(token["s"]), **{k: int(token[k]) for k in ("o", "c", "l")}}
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid page token: {page_token}") from e
+    # Tokens come from the client, they get the same bounds as the first page
+    if (
+        token["o"] < 0
+        or token["c"] < 0
+        or not 1 <= token["l"] <= MAX_QUERY_RESULT_ROW_LIMIT
+    ):
+        raise ValueError(f"Invalid page token: {page_token}")
+    return token
+
+
+def _read_result_page(
+    client: WorkspaceClient,
+    statement_id: str,
+    chunk: ResultData,
+    row_offset: int,
+    row_limit: int,
+) -> tuple[list, Optional[str]]:
+    """
+    Returns up to ``row_limit`` rows starting at ``row_offset``, reading the statement
+    result chunk by chunk from ``chunk`` onwards, and the token of the next page.
+    Only one chunk is held at a time, whatever the size of the result.
+    """
+    rows = []
+    next_offset = row_offset
+    while True:
+        chunk_rows = chunk.data_array or []
+        chunk_offset = chunk.row_offset or 0
+        start = max(next_offset - chunk_offset, 0)
+        page_rows = chunk_rows[start : start + row_limit - len(rows)]
+        rows += page_rows
+        next_offset += len(page_rows)
+        if next_offset < chunk_offset + len(chunk_rows):
+            next_chunk_index = chunk.chunk_index or 0
+        elif chunk.next_chunk_index is None:
+            return rows, None
+        else:
+            next_chunk_index = chunk.next_chunk_index
+            if len(rows) < row_limit:
+                with upstream_call("sql"):
+                    chunk = client.statement_execution.get_statement_result_chunk_n(
+                        statement_id, next_chunk_index
+                    )
+                continue
+        return rows, _encode_page_token(
+            statement_id, next_offset, next_chunk_index, row_limit
+        )
+
+
+def _find_chunk(
+    client: WorkspaceClient, statement: StatementResponse, row_offset: int
+) -> Optional[ResultData]:
+    """Returns the result chunk holding the row at ``row_offset``."""
+    first_chunk = statement.result
+    chunks = (statement.manifest.chunks if statement.manifest else None) or []
+    for chunk_info in chunks:
+        chunk_start = chunk_info.row_offset or 0
+        if chunk_start <= row_offset < chunk_start + (chunk_info.row_count or 0):
+            # A missing chunk index is the first chunk, on either side
+            chunk_index = chunk_info.chunk_index or 0
+            if (
+                first_chunk is not None
+                and (first_chunk.chunk_index or 0) == chunk_index
+            ):
+                return first_chunk
+            with upstream_call("sql"):
+                return client.statement_execution.get_statement_result_chunk_n(
+                    statement.statement_id, chunk_index
+                )
+    return first_chunk
+
+
+def _query_result_page(
+    client: WorkspaceClient,
+    statement: Optional[StatementResponse],
+    row_offset: int,
+    row_limit: int,
+) -> list[TextContent]:
+    if statement is None:
+        return [
+            TextContent(
+                type="text", text=dump_json({"error": "No statement response found."})
+            )
+        ]
+    manifest = statement.manifest
+    status = statement.status
+    response = {
+        "statement_id": statement.statement_id,
+        "state": status.state.value if status and status.state else None,
+        "error": status.error.as_dict() if status and status.error else None,
+        "columns": (
+            [
+                {"name": column.name, "type": column.type_text}
+                for column in manifest.schema.columns or []
+            ]
+            if manifest and manifest.schema
+            else None
+        ),
+        "total_row_count": manifest.total_row_count if manifest else None,
+        "truncated": manifest.truncated if manifest else None,
+        "row_offset": row_offset,
+        "rows": [],
+        "next_page_token": None,
+    }
+    chunk = _find_chunk(client, statement, row_offset)
+    if chunk is not None:
+        response["rows"], response["next_page_token"] = _read_result_page(
+            client, statement.statement_id, chunk, row_offset, row_limit
+        )
+    return [TextContent(type="text", text=dump_json(response))]
+
+
 def _get_attachment_query_result(client: WorkspaceClient, args) -> list[TextContent]:
     model = GetAttachmentQueryResultInput.model_validate(args)
-    result = client.genie.get_message_attachment_query_result(
-        model.space_id, model.conversation_id, model.message_id, model.attachment_id
-    )
-    return [
-        TextContent(
-            type="text",
-            text=dump_json(
-                result.statement_response.as_dict()
-                if result.statement_response
-                else {"error": "No statement response found."}
-            ),
-        )
-    ]
+    statement = get_genie_result_cache().get_query_result(client, model)
+    return _query_result_page(client, statement, model.row_offset, model.row_limit)
 
 
 def _execute_attachment_query(client: WorkspaceClient, args) -> list[TextContent]:
     model = ExecuteAttachmentQueryInput.model_validate(args)
-    result = client.genie.execute_message_attachment_query(
-        model.space_id, model.conversation_id, model.message_id, model.attachment_id
+    statement = get_genie_result_cache().execute_query(client, model)
+    return _query_result_page(client, statement, model.row_offset, model.row_limit)
+
+
+def _get_query_result_page(client: WorkspaceClient, args) -> list[TextContent]:
+    model = GetQueryResultPageInput.model_validate(args)
+    token = _decode_page_token(model.page_token)
+    with upstream_call("sql"):
+        chunk = client.statement_execution.get_statement_result_chunk_n(
+            token["s"], token["c"]
+        )
+    rows, next_page_token = _read_result_page(
+        client, token["s"], chunk, token["o"], token["l"]
     )
     return [
         TextContent(
             type="text",
             text=dump_json(
-                result.statement_response.as_dict()
-                if result.statement_response
-                else {"error": "No statement response found."}
+                {
+                    "statement_id": token["s"],
+                    "row_offset": token["o"],
+                    "rows": rows,
+                    "next_page_token": next_page_token,
+                }
             ),
         )
     ]
@@ -177,54 +571,133 @@ def _execute_attachment_query(client: WorkspaceClient, args) -> list[TextContent
 
 def _get_space(client: WorkspaceClient, args) -> list[TextContent]:
     model = GetSpaceInput.model_validate(args)
-    space = client.genie.get_space(model.space_id)
-    return [
-        TextContent(
-            type="text",
-            text=dump_json(
-                {
-                    "space_id": model.space_id,
-                    "title": space.title,
-                    "description": getattr(space, "description", None),
-                }
-            ),
-        )
-    ]
+    space = get_space_cache().get_space(client, model.space_id)
+    return [TextContent(type="text", text=dump_json(space))]
 
 
 def _generate_download_query_result(client: WorkspaceClient, args) -> list[TextContent]:
     model = GenerateDownloadInput.model_validate(args)
-    result = client.genie.generate_download_full_query_result(
-        model.space_id, model.conversation_id, model.message_id, model.attachment_id
-    )
+    with upstream_call("genie"):
+        result = client.genie.generate_download_full_query_result(
+            model.space_id, model.conversation_id, model.message_id, model.attachment_id
+        )
     return [
         TextContent(
             type="text",
             text=dump_json(
                 {
-                    "transient_statement_id": result.transient_statement_id,
-                    "status": result.status.value if result.status else None,
+                    "download_id": result.download_id,
                 }
             ),
         )
     ]
 
 
-def _poll_message_until_complete(client, args) -> list[TextContent]:
+# States of a download statement that is still being computed
+PENDING_STATEMENT_STATES = {StatementState.PENDING, StatementState.RUNNING}
+
+
+def _fetch_download(client: WorkspaceClient, args) -> list[TextContent]:
+    model = FetchDownloadInput.model_validate(args)
+    store = get_download_store()
+    path = store.get_path(model.download_id)
+    with upstream_call("genie"):
+        result = client.genie.get_download_full_query_result(
+            model.space_id,
+            model.conversation_id,
+            model.message_id,
+            model.attachment_id,
+            model.download_id,
+        )
+    statement = result.statement_response
+    state = statement.status.state if statement and statement.status else None
+    if statement is None or state != StatementState.SUCCEEDED:
+        response = {"download_id": model.download_id, "path": str(path)}
+        if state in PENDING_STATEMENT_STATES:
+            response["state"] = state.value
+            response["message"] = "The download is not ready yet, call again later."
+        else:
+            error = statement.status.error if statement and statement.status else None
+            response["state"] = state.value if state else None
+            response["error"] = error.message if error else "Download failed."
+        return [TextContent(type="text", text=dump_json(response))]
+
+    summary = store.write(model.download_id, iter_result_batches(client, statement))
+    return [TextContent(type="text", text=dump_json(summary))]
+
+
+def _read_download(client: WorkspaceClient, args) -> list[TextContent]:
+    model = ReadDownloadInput.model_validate(args)
+    rows = get_download_store().read(
+        model.download_id, model.row_offset, model.row_limit, model.columns
+    )
+    return [TextContent(type="text", text=dump_json(rows))]
+
+
+# Statuses that usually last long (e.g. a warehouse starting up), polled at the slowest rate
+SLOW_MESSAGE_STATUSES = {"PENDING_WAREHOUSE"}
+POLL_BACKOFF_FACTOR = 1.5
+
+
+async def _report_progress(
+    progress: float, total: Optional[float] = None, message: Optional[str] = None
+) -> None:
+    """Sends an MCP progress notification if the current request asked for them."""
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    if progress_token is None:
+        return
+    await ctx.session.send_progress_notification(
+        progress_token,
+        progress,
+        total=total,
+        message=message,
+        related_request_id=str(ctx.request_id),
+    )
+
+
+def _next_poll_interval(
+    model: PollMessageUntilCompleteInput, interval: float, status_changed: bool
+) -> float:
+    if status_changed:
+        return model.initial_poll_interval_seconds
+    return min(interval * POLL_BACKOFF_FACTOR, model.poll_interval_seconds)
+
+
+async def _poll_message_until_complete(client, args) -> list[TextContent]:
     model = PollMessageUntilCompleteInput.model_validate(args)
-    genie_api = client.genie
-    start_time = time.time()
+    cache = get_genie_result_cache()
+    executor = get_tool_executor()
+    start_time = time.monotonic()
     elapsed = 0
     poll_count = 0
+    status = None
+    interval = model.initial_poll_interval_seconds
 
+    # Sleeping on the event loop keeps no worker thread busy between polls, and is
+    # interrupted as soon as the client cancels the request.
     while elapsed < model.timeout_seconds:
-        message = genie_api.get_message(
-            model.space_id, model.conversation_id, model.message_id
+        message = await executor.run_sync(
+            GenieTool.family,
+            cache.get_message,
+            client,
+            model.space_id,
+            model.conversation_id,
+            model.message_id,
         )
+        previous_status = status
         status = message.status.value if message.status else "UNKNOWN"
         poll_count += 1
+        elapsed = time.monotonic() - start_time
+
+        if status != previous_status:
+            LOGGER.debug(f"Genie message {model.message_id} is now {status}")
+            await _report_progress(elapsed, total=model.timeout_seconds, message=status)
 
-        if status in ["COMPLETED", "FAILED", "QUERY_RESULT_EXPIRED", "CANCELLED"]:
+        if status in TERMINAL_MESSAGE_STATUSES:
             return [
                 TextContent(
                     type="text",
@@ -239,8 +712,14 @@ def _poll_message_until_complete(client, args) -> list[TextContent]:
                 )
             ]
 
-        time.sleep(model.poll_interval_seconds)
-        elapsed = time.time() - start_time
+        if status in SLOW_MESSAGE_STATUSES:
+            interval = model.poll_interval_seconds
+        else:
+            interval = _next_poll_interval(
+                model, interval, status_changed=status != previous_status
+            )
+        await anyio.sleep(min(interval, max(model.timeout_seconds - elapsed, 0)))
+        elapsed = time.monotonic() - start_time
 
     return [
         TextContent(
@@ -258,20 +737,116 @@ def _poll_message_until_complete(client, args) -> list[TextContent]:
     ]
 
 
-def _list_spaces(client, args, space_ids) -> list[TextContent]:
-    results = []
-    for space_id in space_ids:
+async def _wait_for_message(
+    client: WorkspaceClient, result: dict, poll_settings: PollMessageUntilCompleteInput
+) -> GenieMessage:
+    """
+    Polls a message until it reaches a terminal status, keeping its current status in
+    ``result``. The caller bounds the wait, e.g. with a cancel scope.
+    """
+    cache = get_genie_result_cache()
+    executor = get_tool_executor()
+    interval = poll_settings.initial_poll_interval_seconds
+    while True:
+        message = await executor.run_sync(
+            GenieTool.family,
+            cache.get_message,
+            client,
+            result["space_id"],
+            result["conversation_id"],
+            result["message_id"],
+        )
+        previous_status = result["status"]
+        result["status"] = message.status.value if message.status else "UNKNOWN"
+        if result["status"] in TERMINAL_MESSAGE_STATUSES:
+            return message
+        if result["status"] in SLOW_MESSAGE_STATUSES:
+            interval = poll_settings.poll_interval_seconds
+        else:
+            interval = _next_poll_interval(
+                poll_settings,
+                interval,
+                status_changed=result["status"] != previous_status,
+            )
+        await anyio.sleep(interval)
+
+
+def _start_conversation_request(
+    client: WorkspaceClient, space_id: str, model: AskSpacesInput
+) -> Wait[GenieMessage]:
+    with upstream_call("genie"):
+        return client.genie.start_conversation(space_id, model.content)
+
+
+async def _ask_spaces(client, args, space_ids) -> list[TextContent]:
+    model = AskSpacesInput.model_validate(args)
+    requested_space_ids = model.space_ids or space_ids
+    unknown_space_ids = [s for s in requested_space_ids if s not in space_ids]
+    if unknown_space_ids:
+        raise ValueError(
+            f"Unknown Genie spaces {unknown_space_ids}, available spaces are: "
+            f"{', '.join(space_ids)}"
+        )
+    executor = get_tool_executor()
+    start_time = time.monotonic()
+    results = {
+        space_id: {"space_id": space_id, "status": None}
+        for space_id in requested_space_ids
+    }
+    finished = []
+    answered_by = None
+
+    async def ask(space_id: str, cancel_scope: anyio.CancelScope):
+        nonlocal answered_by
+        result = results[space_id]
         try:
-            space = client.genie.get_space(space_id)
-            results.append(
-                {
-                    "space_id": space_id,
-                    "title": space.title,
-                    "description": getattr(space, "description", None),
-                }
+            started = await executor.run_sync(
+                GenieTool.family, _start_conversation_request, client, space_id, model
+            )
+            result["conversation_id"] = started.response.conversation_id
+            result["message_id"] = started.response.message_id
+            poll_settings = PollMessageUntilCompleteInput(
+                space_id=space_id,
+                conversation_id=result["conversation_id"],
+                message_id=result["message_id"],
             )
+            message = await _wait_for_message(client, result, poll_settings)
         except Exception as e:
-            results.append({"space_id": space_id, "error": str(e)})
+            result["error"] = str(e)
+        else:
+            result["attachments"] = getattr(message, "attachments", None)
+            result["error"] = getattr(message, "error", None)
+            if result["status"] == "COMPLETED" and answered_by is None:
+                answered_by = space_id
+                if model.mode == "first":
+                    # The other conversations are abandoned, not cancelled
+                    cancel_scope.cancel()
+        finished.append(space_id)
+        await _report_progress(len(finished), total=len(results), message=space_id)
+
+    # Conversations are started concurrently, blocking calls run in the Genie pool
+    with anyio.move_on_after(model.timeout_seconds):
+        async with anyio.create_task_group() as tg:
+            for space_id in requested_space_ids:
+                tg.start_soon(ask, space_id, tg.cancel_scope)
+
+    return [
+        TextContent(
+            type="text",
+            text=dump_json(
+                {
+                    "answered_by": answered_by,
+                    "mode": model.mode,
+                    "elapsed_time": time.monotonic() - start_time,
+                    "results": list(results.values()),
+                }
+            ),
+        )
+    ]
+
+
+def _list_spaces(client, args, space_ids) -> list[TextContent]:
+    results = get_space_cache().get_spaces(client, space_ids)
     return [TextContent(type="text", text=dump_json(results))]
 
 
@@ -279,9 +854,11 @@ def _list_spaces(client, args, space_ids) -> list[TextContent]:
 
 
 class GenieTool(BaseTool):
+    family = "genie"
 
-    def __init__(self, name, description, input_schema, func):
+    def __init__(self, name, description, input_schema, func, coalesce_calls=True):
         self.func = func
+        self.coalesce_calls = coalesce_calls
         tool_spec = ToolSpec(
             name=name,
             description=description,
@@ -289,8 +866,18 @@ class GenieTool(BaseTool):
         )
         super().__init__(tool_spec)
 
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.func)
+
     def execute(self, **kwargs):
-        return self.func(client=WorkspaceClient(), args=kwargs)
+        if self.is_async:
+            return self.run_aexecute(**kwargs)
+        return self.func(client=get_workspace_client(), args=kwargs)
+
+    async def aexecute(self, **kwargs):
+        client = await get_tool_executor().run_sync(self.family, get_workspace_client)
+        return await self.func(client=client, args=kwargs)
 
 
 def list_genie_tools(settings) -> list[GenieTool]:
@@ -300,12 +887,14 @@ def list_genie_tools(settings) -> list[GenieTool]:
             description="Start a new conversation in a Genie space.",
             input_schema=StartConversationInput.model_json_schema(),
             func=_start_conversation,
+            coalesce_calls=False,
         ),
         GenieTool(
             name="genie_create_message",
             description="Create a message in a conversation.",
             input_schema=CreateMessageInput.model_json_schema(),
             func=_create_message,
+            coalesce_calls=False,
         ),
         GenieTool(
             name="genie_get_message",
@@ -315,15 +904,26 @@ def list_genie_tools(settings) -> list[GenieTool]:
         ),
         GenieTool(
             name="genie_get_query_result",
-            description="Get SQL query result from a message attachment.",
+            description="Get SQL query result from a message attachment, one page of "
+            "rows at a time.",
             input_schema=GetAttachmentQueryResultInput.model_json_schema(),
             func=_get_attachment_query_result,
         ),
         GenieTool(
             name="genie_execute_query",
-            description="Execute SQL query from a message attachment.",
+            description="Execute SQL query from a message attachment, returns the "
+            "first page of rows of the result.",
             input_schema=ExecuteAttachmentQueryInput.model_json_schema(),
             func=_execute_attachment_query,
+            coalesce_calls=False,
+        ),
+        GenieTool(
+            name="genie_get_query_result_page",
+            description="Get the next page of rows of a query result, using the "
+            "next_page_token returned by genie_get_query_result, genie_execute_query "
+            "or a previous call of this tool.",
+            input_schema=GetQueryResultPageInput.model_json_schema(),
+            func=_get_query_result_page,
         ),
         GenieTool(
             name="genie_get_space",
@@ -336,12 +936,34 @@ def list_genie_tools(settings) -> list[GenieTool]:
             description="Generate download link for full query result.",
             input_schema=GenerateDownloadInput.model_json_schema(),
             func=_generate_download_query_result,
+            coalesce_calls=False,
+        ),
+        GenieTool(
+            name="genie_fetch_download",
+            description="Fetch the full query result of a download generated with "
+            "genie_generate_download into a local file. Returns the row count, the "
+            "schema and statistics of every column, read rows of the result with "
+            "genie_read_download.",
+            input_schema=FetchDownloadInput.model_json_schema(),
+            func=_fetch_download,
+        ),
+        GenieTool(
+            name="genie_read_download",
+            description="Read a slice of the rows of a query result fetched with "
+            "genie_fetch_download, without fetching the result again.",
+            input_schema=ReadDownloadInput.model_json_schema(),
+            func=_read_download,
         ),
         GenieTool(
             name="genie_poll_until_complete",
-            description="Poll a message until its status is COMPLETED or timeout.",
+            description=(
+                "Poll a message until its status is COMPLETED or timeout. Sends a "
+                "progress notification whenever the message status changes."
+            ),
             input_schema=PollMessageUntilCompleteInput.model_json_schema(),
             func=_poll_message_until_complete,
+            # Progress notifications only reach the request that runs the poll
+            coalesce_calls=False,
         ),
         GenieTool(
             name="genie_list_spaces",
@@ -359,4 +981,16 @@ def list_genie_tools(settings) -> list[GenieTool]:
             input_schema=ListSpacesInput.model_json_schema(),
             func=functools.partial(_list_spaces, space_ids=settings.genie_space_ids),
         ),
+        GenieTool(
+            name="genie_ask_spaces",
+            description=(
+                "Ask a question to several Genie spaces at once, when it is unclear "
+                "which space can answer it. Returns which space answered, and the "
+                "conversation started in every space so that it can be continued "
+                "or polled with genie_poll_until_complete."
+            ),
+            input_schema=AskSpacesInput.model_json_schema(),
+            func=functools.partial(_ask_spaces, space_ids=settings.genie_space_ids),
+            coalesce_calls=False,
+        ),
     ]
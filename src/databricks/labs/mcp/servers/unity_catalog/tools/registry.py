@@ -0,0 +1,137 @@
+"""
+Registry of the tools served by the MCP server.
+"""
+
+import asyncio
+import base64
+import binascii
+import bisect
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.session import ServerSession
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, ErrorData, Tool as ToolSpec
+
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.utils import logger
+
+# How long to wait for a session to accept a notification before dropping it
+NOTIFICATION_TIMEOUT_SECONDS = 5
+
+
+def _encode_cursor(last_name: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": last_name}).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        last_name = json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_name = None
+    if not isinstance(last_name, str):
+        raise McpError(ErrorData(code=INVALID_PARAMS, message="Invalid cursor"))
+    return last_name
+
+
+class ToolRegistry:
+    """
+    Holds the tools served by the MCP server. When the catalog is refreshed, the new
+    tools are swapped in atomically: in-flight calls keep using the tool they looked up,
+    and connected sessions are told to list the tools again.
+    """
+
+    def __init__(self, tools: dict[str, BaseTool]):
+        self.tools = tools
+        self._lock = threading.Lock()
+        # Sessions that listed or called tools, with the event loop serving them
+        self._sessions: WeakKeyDictionary[ServerSession, asyncio.AbstractEventLoop] = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def session_count(self) -> int:
+        """Number of tracked sessions that are still alive."""
+        with self._lock:
+            return len(self._sessions)
+
+    def get_tool(self, name: str) -> BaseTool:
+        return self.tools[name]
+
+    def list_tools_page(
+        self, cursor: Optional[str], page_size: int
+    ) -> tuple[list[BaseTool], Optional[str]]:
+        """
+        Returns the tools of the page starting at ``cursor`` and the cursor of the next
+        page, if any. A ``page_size`` of 0 returns all remaining tools in one page.
+
+        Tools are listed by name, and a cursor holds the last name of its page. A
+        client paging while the tools are swapped thus neither skips nor repeats the
+        tools present before and after the swap.
+        """
+        tools = self.tools
+        names = sorted(tools)
+        start = bisect.bisect_right(names, _decode_cursor(cursor)) if cursor else 0
+        if page_size <= 0:
+            return [tools[name] for name in names[start:]], None
+        page = names[start : start + page_size]
+        next_cursor = (
+            _encode_cursor(page[-1]) if start + page_size < len(names) else None
+        )
+        return [tools[name] for name in page], next_cursor
+
+    def swap(self, tools: dict[str, BaseTool]) -> bool:
+        """Replaces the served tools, returns whether the tool definitions changed."""
+        changed = list(tools) != list(self.tools) or any(
+            tool is not self.tools[name]
+            and not tool.has_same_definition(self.tools[name])
+            for name, tool in tools.items()
+        )
+        # Rebinding the attribute is atomic, readers see either the old or new dict
+        self.tools = tools
+        return changed
+
+    def track_current_session(self) -> None:
+        """Remembers the session of the request being handled, to notify it later."""
+        ctx = request_ctx.get(None)
+        if ctx is None:
+            return
+        with self._lock:
+            self._sessions[ctx.session] = asyncio.get_running_loop()
+
+    def notify_tools_changed(self) -> None:
+        """Sends notifications/tools/list_changed to every tracked session."""
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for session, loop in sessions:
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    session.send_tool_list_changed(), loop
+                ).result(timeout=NOTIFICATION_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.debug(f"Dropping session that could not be notified: {e}")
+                with self._lock:
+                    self._sessions.pop(session, None)
+
+
+def materialize_tool_specs(
+    tools: list[BaseTool], max_concurrency: int
+) -> list[ToolSpec]:
+    """
+    Builds the specs of the given tools concurrently. Tools whose spec cannot be built
+    (e.g. a function that was dropped since discovery) are left out.
+    """
+
+    def get_tool_spec(tool: BaseTool) -> Optional[ToolSpec]:
+        try:
+            return tool.tool_spec
+        except Exception as e:
+            logger.warning(f"Skipping tool {tool.name}, failed to build its spec: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return [spec for spec in pool.map(get_tool_spec, tools) if spec is not None]
@@ -0,0 +1,103 @@
+"""
+Resolution of the configured schema patterns to the Unity Catalog schemas to serve.
+"""
+
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+from databricks.sdk import WorkspaceClient
+
+from databricks.labs.mcp.servers.unity_catalog.cli import (
+    DEFAULT_DISCOVERY_MAX_CONCURRENCY,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import upstream_call
+
+WILDCARD_CHARS = "*?["
+
+# System schema present in every catalog, only served when named explicitly
+INFORMATION_SCHEMA = "information_schema"
+
+
+def _has_wildcard(name: str) -> bool:
+    return any(char in name for char in WILDCARD_CHARS)
+
+
+def _match(names: list[str], pattern: str) -> list[str]:
+    if not _has_wildcard(pattern):
+        return [pattern]
+    return [name for name in names if fnmatch.fnmatchcase(name, pattern)]
+
+
+def resolve_schema_full_names(
+    workspace_client: WorkspaceClient,
+    patterns: list[str],
+    max_concurrency: int = DEFAULT_DISCOVERY_MAX_CONCURRENCY,
+) -> list[str]:
+    """
+    Returns the full names of the schemas matching the given ``catalog.schema``
+    patterns, in pattern order and without duplicates. Names without wildcards are
+    returned as is, catalogs and schemas are only listed for the patterns that need it.
+    A literal schema name in a catalog wildcard only matches the catalogs that have it.
+    """
+    split_patterns = [pattern.split(".") for pattern in patterns]
+
+    catalog_names = []
+    if any(_has_wildcard(catalog) for catalog, _ in split_patterns):
+        with upstream_call("unity_catalog"):
+            catalog_names = [
+                catalog.name
+                for catalog in workspace_client.catalogs.list()
+                if catalog.name
+            ]
+    # Schemas are listed for wildcard schema names, and to drop literal schema names
+    # from the catalogs matched by a wildcard that do not have such a schema
+    catalogs_by_pattern = [
+        (
+            _match(catalog_names, catalog),
+            schema,
+            _has_wildcard(catalog) or _has_wildcard(schema),
+        )
+        for catalog, schema in split_patterns
+    ]
+
+    # Schemas are listed once per catalog, concurrently across catalogs
+    catalogs_to_list = list(
+        dict.fromkeys(
+            catalog
+            for catalogs, _, list_schemas in catalogs_by_pattern
+            if list_schemas
+            for catalog in catalogs
+        )
+    )
+
+    def list_schema_names(catalog_name: str) -> list[str]:
+        with upstream_call("unity_catalog"):
+            return [
+                schema.name
+                for schema in workspace_client.schemas.list(catalog_name=catalog_name)
+                if schema.name
+            ]
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        schema_names = dict(
+            zip(catalogs_to_list, pool.map(list_schema_names, catalogs_to_list))
+        )
+
+    def match_schemas(catalog: str, schema: str, list_schemas: bool) -> list[str]:
+        if not list_schemas:
+            return [schema]
+        if not _has_wildcard(schema):
+            return [schema] if schema in schema_names[catalog] else []
+        return [
+            name
+            for name in schema_names[catalog]
+            if name != INFORMATION_SCHEMA and fnmatch.fnmatchcase(name, schema)
+        ]
+
+    schema_full_names = [
+        f"{catalog}.{schema_name}"
+        for catalogs, schema, list_schemas in catalogs_by_pattern
+        for catalog in catalogs
+        for schema_name in match_schemas(catalog, schema, list_schemas)
+    ]
+    return list(dict.fromkeys(schema_full_names))
@@ -0,0 +1,104 @@
+"""
+Local snapshots of the discovered tool catalog, used to warm start new processes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from databricks.labs.mcp._version import __version__ as VERSION
+from databricks.labs.mcp.servers.unity_catalog.cli import CliSettings
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    get_function_client,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.functions import UCFunctionTool
+from databricks.labs.mcp.servers.unity_catalog.tools.vector_search import (
+    VectorSearchTool,
+)
+from databricks.labs.mcp.utils import logger
+
+# Bump whenever the snapshot layout changes, older snapshots are then ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def get_snapshot_path(settings: CliSettings, host: Optional[str]) -> Optional[Path]:
+    """
+    Returns the snapshot file for the given settings, or None if snapshots are disabled.
+    The file name is derived from everything that determines the discovered catalog,
+    so a snapshot is never served for another workspace, schema or server version.
+    """
+    if not settings.catalog_snapshot_dir:
+        return None
+    key = json.dumps(
+        {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "server_version": VERSION,
+            "host": host,
+            "schema_full_name": settings.schema_full_name,
+            "genie_space_ids": sorted(settings.genie_space_ids),
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return Path(settings.catalog_snapshot_dir) / f"tool-catalog-{digest}.json"
+
+
+def save_snapshot(path: Path, tools: list[BaseTool]) -> None:
+    snapshot = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "server_version": VERSION,
+        "created_at": time.time(),
+        "vector_search": [
+            tool.to_snapshot() for tool in tools if isinstance(tool, VectorSearchTool)
+        ],
+        "uc_functions": [
+            tool.to_snapshot() for tool in tools if isinstance(tool, UCFunctionTool)
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so concurrent readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def load_snapshot(path: Path, settings: CliSettings) -> Optional[list[BaseTool]]:
+    """
+    Returns the vector search and UC function tools stored in the snapshot, or None
+    if there is no usable snapshot.
+    """
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tool catalog snapshot {path}: {e}")
+        return None
+
+    if snapshot.get("format") != SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    tools: list[BaseTool] = [
+        VectorSearchTool.from_snapshot(data, settings)
+        for data in snapshot["vector_search"]
+    ]
+    if snapshot["uc_functions"]:
+        client = get_function_client()
+        tools += [
+            UCFunctionTool.from_snapshot(data, client, settings)
+            for data in snapshot["uc_functions"]
+        ]
+    age = time.time() - snapshot["created_at"]
+    logger.info(f"Loaded {len(tools)} tools from snapshot {path} ({age:.0f}s old)")
+    return tools
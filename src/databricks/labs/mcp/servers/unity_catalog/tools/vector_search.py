@@ -1,20 +1,246 @@
+import fnmatch
 import json
-from pydantic import BaseModel
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
 from databricks.sdk import WorkspaceClient
-from databricks.vector_search.client import VectorSearchClient
-from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
-from databricks.labs.mcp.servers.unity_catalog.cli import CliSettings
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import (
+    DEFAULT_BATCH_MAX_CONCURRENCY,
+    BaseTool,
+    BatchTool,
+    get_bounded_tool_name,
+    with_batch_tools as with_tool_batch_tools,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    get_vector_search_client,
+    get_workspace_client,
+    upstream_call,
+)
+from databricks.labs.mcp.servers.unity_catalog.cli import (
+    CliSettings,
+    DEFAULT_DISCOVERY_MAX_CONCURRENCY,
+    get_settings,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.cache import ResultCache
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import get_tool_executor
+from databricks.vector_search.index import VectorSearchIndex
 from mcp.types import TextContent, Tool as ToolSpec
 
+LOGGER = logging.getLogger(__name__)
+
 # Constant storing vector index content vector column name
 CONTENT_VECTOR_COLUMN_NAME = "__db_content_vector"
 
+MAX_BATCH_QUERIES = 32
+
+# Name of the column holding the similarity score, which the index appends to every
+# returned row
+SCORE_COLUMN_NAME = "score"
+
+# Appended to cells cut to the per-cell byte budget
+TRUNCATION_MARKER = "...[truncated]"
+
+DEFAULT_INDEX_CACHE_TTL_SECONDS = 900
+
+# The vector search SDK raises plain exceptions carrying the response body and status
+# code. These markers identify errors after which a cached index handle (or the
+# columns it is queried with) can no longer be trusted. Auth errors and other invalid
+# parameters are not retried: a fresh handle of the same client would fail the same.
+STALE_INDEX_ERROR_MARKERS = (
+    "status_code 404",
+    "RESOURCE_DOES_NOT_EXIST",
+)
+# Invalid parameter errors only point at a changed index schema when about columns
+SCHEMA_MISMATCH_ERROR_MARKER = "INVALID_PARAMETER_VALUE"
+
+
+class IndexHandleCache:
+    """
+    Caches vector search index handles by endpoint and index name, so queries skip the
+    index metadata round trip. Entries expire after a TTL and can be invalidated when
+    the upstream index reports it is gone or has changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], tuple[float, VectorSearchIndex]] = {}
+
+    def get(
+        self,
+        endpoint_name: str,
+        index_name: str,
+        ttl_seconds: float,
+        loader: Callable[[], VectorSearchIndex],
+    ) -> VectorSearchIndex:
+        key = (endpoint_name, index_name)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+            return entry[1]
+        index = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), index)
+        return index
+
+    def invalidate(self, endpoint_name: str, index_name: str) -> None:
+        with self._lock:
+            self._entries.pop((endpoint_name, index_name), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+INDEX_HANDLE_CACHE = IndexHandleCache()
+
+SearchResultKey = tuple[str, str, tuple[str, ...], int]
+
+
+class SearchResultCache(ResultCache):
+    """
+    Cache of similarity search results, keyed by index, normalized query text, columns
+    and number of results.
+    """
+
+    @staticmethod
+    def make_key(
+        index_name: str, query: str, columns: list[str], num_results: int
+    ) -> SearchResultKey:
+        # Queries only differing in whitespace return the same results
+        return (index_name, " ".join(query.split()), tuple(columns), num_results)
+
+    def invalidate_index(self, index_name: str) -> None:
+        self.invalidate(lambda key: key[0] == index_name)
+
+
+@lru_cache
+def get_search_result_cache() -> SearchResultCache:
+    return SearchResultCache(get_settings().vector_search_result_cache_max_bytes)
+
+
+def _get_index_result_cache_ttl_seconds(
+    index_name: str, ttl_seconds: float, excluded_indexes: list[str]
+) -> float:
+    """Returns how long results of the index are cached, 0 if they are not cached."""
+    if any(fnmatch.fnmatchcase(index_name, pattern) for pattern in excluded_indexes):
+        return 0
+    return ttl_seconds
+
+
+def _is_stale_index_error(error: Exception) -> bool:
+    message = str(error)
+    if SCHEMA_MISMATCH_ERROR_MARKER in message:
+        return "column" in message.lower()
+    return any(marker in message for marker in STALE_INDEX_ERROR_MARKERS)
+
 
 class QueryInput(BaseModel):
     query: str
+    columns: Optional[list[str]] = Field(
+        None,
+        description="Columns to return, defaults to all columns of the index",
+    )
+
+
+class BatchQueryInput(BaseModel):
+    queries: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_QUERIES,
+        description="Queries to run against the index",
+    )
+    deduplicate: bool = Field(
+        False,
+        description="Leave out of a query's results the rows already returned for an "
+        "earlier query of the batch",
+    )
+    columns: Optional[list[str]] = Field(
+        None,
+        description="Columns to return, defaults to all columns of the index",
+    )
+
+
+def _truncate_cell(value, max_cell_bytes: int):
+    if not max_cell_bytes or not isinstance(value, str):
+        return value
+    encoded = value.encode()
+    if len(encoded) <= max_cell_bytes:
+        return value
+    return encoded[:max_cell_bytes].decode(errors="ignore") + TRUNCATION_MARKER
+
+
+def _dump_compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _fit_rows(
+    rows: list, max_cell_bytes: int, budget: Optional[int]
+) -> tuple[list, Optional[int]]:
+    """
+    Returns the rows with their cells truncated to ``max_cell_bytes``, as many as fit
+    in ``budget`` bytes (None for no limit), and the budget left.
+    """
+    fitted = []
+    for row in rows:
+        if isinstance(row, list):
+            row = [_truncate_cell(value, max_cell_bytes) for value in row]
+        if budget is not None:
+            # The separating comma
+            size = len(_dump_compact_json(row).encode()) + 1
+            if size > budget:
+                break
+            budget -= size
+        fitted.append(row)
+    return fitted, budget
+
+
+def encode_search_results(
+    columns: list[str],
+    results: list[tuple[Optional[str], list]],
+    max_cell_bytes: int = 0,
+    max_response_bytes: int = 0,
+) -> str:
+    """
+    Encodes the rows returned for one or several queries as compact JSON: the column
+    names once, followed by the rows of every query as plain value arrays. Cells
+    longer than ``max_cell_bytes`` are cut and marked, and rows that would make the
+    response exceed ``max_response_bytes`` are left out and counted in
+    ``omitted_rows``. A query of None encodes the rows of a single query.
+    """
+    header = {"columns": columns + [SCORE_COLUMN_NAME]}
+    budget = None
+    if max_response_bytes:
+        # Leave room for the keys of every query and their omitted rows counts
+        budget = max_response_bytes - len(_dump_compact_json(header).encode()) - 32
+        budget -= sum(
+            len(_dump_compact_json(query).encode()) + 48
+            for query, _ in results
+            if query is not None
+        )
+
+    groups = []
+    for query, rows in results:
+        fitted_rows, budget = _fit_rows(rows, max_cell_bytes, budget)
+        group = {"rows": fitted_rows}
+        if len(fitted_rows) < len(rows):
+            group["omitted_rows"] = len(rows) - len(fitted_rows)
+        if query is not None:
+            group = {"query": query, **group}
+        groups.append(group)
+
+    if len(groups) == 1 and results[0][0] is None:
+        return _dump_compact_json({**header, **groups[0]})
+    return _dump_compact_json({**header, "results": groups})
 
 
 class VectorSearchTool(BaseTool):
+    family = "vector_search"
+
     def __init__(
         self,
         endpoint_name: str,
@@ -22,44 +248,228 @@ class VectorSearchTool(BaseTool):
         tool_name: str,
         columns: list[str],
         num_results: int = 5,
+        index_cache_ttl_seconds: float = DEFAULT_INDEX_CACHE_TTL_SECONDS,
+        updated_at: Optional[int] = None,
+        result_cache_ttl_seconds: float = 0,
+        max_cell_bytes: int = 0,
+        max_response_bytes: int = 0,
     ):
         self.endpoint_name = endpoint_name
         self.index_name = index_name
         self.tool_name = tool_name
         self.columns = columns
         self.num_results = num_results
+        self.index_cache_ttl_seconds = index_cache_ttl_seconds
+        # Update time of the index table, used to skip unchanged indexes on refresh
+        self.updated_at = updated_at
+        self.result_cache_ttl_seconds = result_cache_ttl_seconds
+        self.max_cell_bytes = max_cell_bytes
+        self.max_response_bytes = max_response_bytes
 
         tool_spec = ToolSpec(
             name=tool_name,
-            description=f"Searches the vector index `{index_name}`.",
+            description=f"Searches the vector index `{index_name}`. "
+            f"Available columns: {', '.join(columns)}.",
             inputSchema=QueryInput.model_json_schema(),
         )
         super().__init__(tool_spec)
 
+    def to_snapshot(self) -> dict:
+        return {
+            "endpoint_name": self.endpoint_name,
+            "index_name": self.index_name,
+            "tool_name": self.tool_name,
+            "columns": self.columns,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict, settings: CliSettings) -> "VectorSearchTool":
+        return cls(
+            data["endpoint_name"],
+            data["index_name"],
+            data["tool_name"],
+            data["columns"],
+            settings.vector_search_num_results,
+            settings.vector_search_index_cache_ttl_seconds,
+            data["updated_at"],
+            _get_index_result_cache_ttl_seconds(
+                data["index_name"],
+                settings.vector_search_result_cache_ttl_seconds,
+                settings.vector_search_result_cache_excluded_indexes,
+            ),
+            settings.vector_search_max_cell_bytes,
+            settings.vector_search_max_response_bytes,
+        )
+
+    def _get_index(self) -> VectorSearchIndex:
+        return INDEX_HANDLE_CACHE.get(
+            self.endpoint_name,
+            self.index_name,
+            self.index_cache_ttl_seconds,
+            self._fetch_index,
+        )
+
+    def _fetch_index(self) -> VectorSearchIndex:
+        with upstream_call("vector_search"):
+            return get_vector_search_client().get_index(index_name=self.index_name)
+
+    def _refresh_index(self) -> None:
+        # The columns are left as they are, they must match the tool spec advertised to
+        # clients. A tool with the new columns replaces this one on the next catalog
+        # refresh, as the update time of the index changed.
+        INDEX_HANDLE_CACHE.invalidate(self.endpoint_name, self.index_name)
+        if self.result_cache_ttl_seconds:
+            get_search_result_cache().invalidate_index(self.index_name)
+
+    def get_columns(self, columns: Optional[list[str]]) -> list[str]:
+        """Returns the columns to query, validating a projection requested by a call."""
+        if columns is None:
+            return self.columns
+        unknown_columns = [column for column in columns if column not in self.columns]
+        if unknown_columns or not columns:
+            raise ValueError(
+                f"Unknown columns {unknown_columns} for index {self.index_name}, "
+                f"available columns are: {', '.join(self.columns)}"
+            )
+        return columns
+
+    def _similarity_search(self, query: str, columns: list[str]) -> list:
+        index = self._get_index()
+        with upstream_call("vector_search"):
+            results = index.similarity_search(
+                query_text=query,
+                columns=columns,
+                num_results=self.num_results,
+            )
+        return results.get("result", {}).get("data_array", [])
+
+    def _search(self, query: str, columns: Optional[list[str]]) -> list:
+        try:
+            return self._similarity_search(query, self.get_columns(columns))
+        except Exception as e:
+            if not _is_stale_index_error(e):
+                raise
+            # The index was recreated or its schema changed: fetch the index again,
+            # then retry once
+            LOGGER.info(f"Refreshing cached handle of {self.index_name} after: {e}")
+            self._refresh_index()
+            return self._similarity_search(query, self.get_columns(columns))
+
+    def search(self, query: str, columns: Optional[list[str]] = None) -> list:
+        """
+        Returns the rows matching the query, with the values of the given columns (all
+        columns by default) followed by the similarity score.
+        """
+        if not self.result_cache_ttl_seconds:
+            return self._search(query, columns)
+        cache = get_search_result_cache()
+        key = cache.make_key(
+            self.index_name, query, self.get_columns(columns), self.num_results
+        )
+        docs = cache.get(key)
+        if docs is None:
+            docs = self._search(query, columns)
+            cache.put(key, docs, self.result_cache_ttl_seconds)
+        return docs
+
     def execute(self, **kwargs):
         model = QueryInput.model_validate(kwargs)
-        vsc = VectorSearchClient(disable_notice=True)
+        docs = self.search(model.query, model.columns)
+        text = encode_search_results(
+            self.get_columns(model.columns),
+            [(None, docs)],
+            self.max_cell_bytes,
+            self.max_response_bytes,
+        )
+        return [TextContent(type="text", text=text)]
+
 
-        index = vsc.get_index(index_name=self.index_name)
+class VectorSearchBatchTool(BatchTool):
+    """
+    Runs several queries against the index of a vector search tool in one call. The
+    queries share the index handle, columns and result cache of that tool, and run
+    concurrently in the vector search worker pool.
+    """
 
-        results = index.similarity_search(
-            query_text=model.query,
-            columns=self.columns,
-            num_results=self.num_results,
+    family = "vector_search"
+    tool_type = VectorSearchTool
+
+    def __init__(
+        self,
+        search_tool: VectorSearchTool,
+        max_concurrency: int = DEFAULT_BATCH_MAX_CONCURRENCY,
+    ):
+        self.search_tool = search_tool
+        tool_spec = ToolSpec(
+            name=get_bounded_tool_name(f"{search_tool.tool_name}_batch"),
+            description=f"Runs several searches against the vector index "
+            f"`{search_tool.index_name}` at once, results are grouped per query. "
+            f"Available columns: {', '.join(search_tool.columns)}.",
+            inputSchema=BatchQueryInput.model_json_schema(),
         )
+        super().__init__(tool_spec, max_concurrency)
 
-        docs = results.get("result", {}).get("data_array", [])
+    async def aexecute(self, **kwargs):
+        model = BatchQueryInput.model_validate(kwargs)
+        columns = self.search_tool.get_columns(model.columns)
+        executor = get_tool_executor()
 
-        return [TextContent(type="text", text=json.dumps(docs, indent=2))]
+        async def search(query: str) -> list:
+            return await executor.run_sync(
+                self.family, self.search_tool.search, query, model.columns
+            )
+
+        results = await self.gather(search, model.queries)
+        if model.deduplicate:
+            results = _deduplicate_rows(results)
+        text = encode_search_results(
+            columns,
+            list(zip(model.queries, results)),
+            self.search_tool.max_cell_bytes,
+            self.search_tool.max_response_bytes,
+        )
+        return [TextContent(type="text", text=text)]
+
+
+def _deduplicate_rows(results: list[list]) -> list[list]:
+    seen = set()
+    deduplicated = []
+    for docs in results:
+        unique_docs = []
+        for doc in docs:
+            # The similarity score differs per query, rows are compared without it,
+            # which the index returns as the last value of every row
+            key = json.dumps(doc[:-1] if isinstance(doc, list) else doc, default=str)
+            if key not in seen:
+                seen.add(key)
+                unique_docs.append(doc)
+        deduplicated.append(unique_docs)
+    return deduplicated
+
+
+def with_batch_tools(tools: list[BaseTool], settings: CliSettings) -> list[BaseTool]:
+    """
+    Returns the given tools with every vector search tool followed by its batch
+    variant, if batch tools are enabled.
+    """
+    if not settings.vector_search_batch_tools:
+        return list(tools)
+    return with_tool_batch_tools(
+        tools, VectorSearchBatchTool, settings.vector_search_batch_max_concurrency
+    )
+
+
+def _filter_columns(columns) -> list[str]:
+    return [col.name for col in columns if col.name != CONTENT_VECTOR_COLUMN_NAME]
 
 
 def get_table_columns(
     workspace_client: WorkspaceClient, full_table_name: str
 ) -> list[str]:
-    table_info = workspace_client.tables.get(full_table_name)
-    return [
-        col.name for col in table_info.columns if col.name != CONTENT_VECTOR_COLUMN_NAME
-    ]
+    with upstream_call("unity_catalog"):
+        table_info = workspace_client.tables.get(full_table_name)
+    return _filter_columns(table_info.columns)
 
 
 def _list_vector_search_tools(
@@ -67,32 +477,99 @@ def _list_vector_search_tools(
     catalog_name: str,
     schema_name: str,
     vector_search_num_results: int,
+    index_cache_ttl_seconds: float = DEFAULT_INDEX_CACHE_TTL_SECONDS,
+    max_concurrency: int = DEFAULT_DISCOVERY_MAX_CONCURRENCY,
+    previous_tools: Optional[list[VectorSearchTool]] = None,
+    qualify_tool_names: bool = False,
+    result_cache_ttl_seconds: float = 0,
+    result_cache_excluded_indexes: Optional[list[str]] = None,
+    max_cell_bytes: int = 0,
+    max_response_bytes: int = 0,
 ) -> list[VectorSearchTool]:
-    tools = []
-    for table in workspace_client.tables.list(
-        catalog_name=catalog_name, schema_name=schema_name
-    ):
-        if not table.properties or "model_endpoint_url" not in table.properties:
-            continue
-
-        endpoint = table.properties["model_endpoint_url"]
-        index_name = table.full_name
-        tool_name = f"vector_search_{table.name}"
+    """
+    Returns a tool per vector search index of the schema. With ``qualify_tool_names``,
+    tool names include the catalog and schema, so that indexes with the same name in
+    different schemas do not collide. Results of the indexes matching
+    ``result_cache_excluded_indexes`` are never cached.
+    """
+    result_cache_excluded_indexes = result_cache_excluded_indexes or []
+    # The listing is paged lazily, all pages are fetched in the timed block
+    with upstream_call("unity_catalog"):
+        indexes = [
+            table
+            for table in workspace_client.tables.list(
+                catalog_name=catalog_name, schema_name=schema_name
+            )
+            if table.properties and "model_endpoint_url" in table.properties
+        ]
 
-        columns = get_table_columns(workspace_client, index_name)
+    previous_tools_by_index = {tool.index_name: tool for tool in previous_tools or []}
 
-        tools.append(
-            VectorSearchTool(
-                endpoint, index_name, tool_name, columns, vector_search_num_results
-            )
+    def get_tool(table) -> VectorSearchTool:
+        updated_at = getattr(table, "updated_at", None)
+        previous_tool = previous_tools_by_index.get(table.full_name)
+        if qualify_tool_names:
+            tool_name = f"vector_search_{catalog_name}__{schema_name}__{table.name}"
+        else:
+            tool_name = f"vector_search_{table.name}"
+        tool_name = get_bounded_tool_name(tool_name)
+        unchanged = (
+            previous_tool is not None
+            and updated_at is not None
+            and previous_tool.updated_at == updated_at
+        )
+        # A tool is renamed when schema patterns start or stop matching several schemas
+        if unchanged and previous_tool.tool_name == tool_name:
+            return previous_tool
+        # The listing usually carries the columns already, only fall back to a
+        # tables.get call for the indexes it omitted them for
+        if getattr(table, "columns", None):
+            columns = _filter_columns(table.columns)
+        else:
+            columns = get_table_columns(workspace_client, table.full_name)
+        endpoint_name = table.properties["model_endpoint_url"]
+        if previous_tool is not None and not unchanged:
+            INDEX_HANDLE_CACHE.invalidate(endpoint_name, table.full_name)
+            if previous_tool.result_cache_ttl_seconds:
+                get_search_result_cache().invalidate_index(table.full_name)
+        return VectorSearchTool(
+            endpoint_name,
+            table.full_name,
+            tool_name,
+            columns,
+            vector_search_num_results,
+            index_cache_ttl_seconds,
+            updated_at,
+            _get_index_result_cache_ttl_seconds(
+                table.full_name, result_cache_ttl_seconds, result_cache_excluded_indexes
+            ),
+            max_cell_bytes,
+            max_response_bytes,
         )
 
-    return tools
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return list(pool.map(get_tool, indexes))
 
 
-def list_vector_search_tools(settings: CliSettings) -> list[VectorSearchTool]:
-    workspace_client = WorkspaceClient()
-    catalog_name, schema_name = settings.schema_full_name.split(".")
+def list_vector_search_tools(
+    settings: CliSettings,
+    schema_full_name: str,
+    previous_tools: Optional[list[VectorSearchTool]] = None,
+    qualify_tool_names: bool = False,
+) -> list[VectorSearchTool]:
+    workspace_client = get_workspace_client()
+    catalog_name, schema_name = schema_full_name.split(".")
     return _list_vector_search_tools(
-        workspace_client, catalog_name, schema_name, settings.vector_search_num_results
+        workspace_client,
+        catalog_name,
+        schema_name,
+        settings.vector_search_num_results,
+        settings.vector_search_index_cache_ttl_seconds,
+        settings.discovery_max_concurrency,
+        previous_tools,
+        qualify_tool_names,
+        settings.vector_search_result_cache_ttl_seconds,
+        settings.vector_search_result_cache_excluded_indexes,
+        settings.vector_search_max_cell_bytes,
+        settings.vector_search_max_response_bytes,
     )
@@ -1,8 +1,32 @@
 import pytest
 from databricks.labs.mcp.servers.unity_catalog.cli import get_settings, CliSettings
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import get_client_registry
+from databricks.labs.mcp.servers.unity_catalog.tools.downloads import (
+    get_download_store,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import get_tool_executor
+from databricks.labs.mcp.servers.unity_catalog.tools.functions import (
+    get_function_result_cache,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.genie import (
+    get_genie_result_cache,
+    get_space_cache,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.vector_search import (
+    INDEX_HANDLE_CACHE,
+    get_search_result_cache,
+)
 
 
 @pytest.fixture(autouse=True)
 def reset_settings_cache():
     CliSettings.model_config["env_file"] = ""
     get_settings.cache_clear()
+    get_tool_executor.cache_clear()
+    get_client_registry.cache_clear()
+    get_download_store.cache_clear()
+    get_function_result_cache.cache_clear()
+    get_genie_result_cache.cache_clear()
+    get_space_cache.cache_clear()
+    get_search_result_cache.cache_clear()
+    INDEX_HANDLE_CACHE.clear()
@@ -0,0 +1,219 @@
+from unittest import mock
+
+import anyio
+import pytest
+from mcp import types
+from mcp.server import Server
+from mcp.types import JSONRPCMessage, JSONRPCNotification
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.testclient import TestClient
+
+from databricks.labs.mcp.base import (
+    CompressionMiddleware,
+    InMemoryEventStore,
+    _get_accepted_encodings,
+    get_serveable_app,
+)
+
+
+def make_message(i: int, padding: str = "") -> JSONRPCMessage:
+    return JSONRPCMessage(
+        JSONRPCNotification(
+            jsonrpc="2.0", method="notifications/message", params={"i": i, "p": padding}
+        )
+    )
+
+
+def replay(store, last_event_id: str):
+    sent = []
+
+    async def send_callback(event):
+        sent.append((event.event_id, event.message.root.params["i"]))
+
+    stream_id = anyio.run(store.replay_events_after, last_event_id, send_callback)
+    return stream_id, sent
+
+
+def store(store, stream_id: str, message: JSONRPCMessage):
+    return anyio.run(store.store_event, stream_id, message)
+
+
+def test_replay_events_after():
+    event_store = InMemoryEventStore(max_events_per_stream=3)
+    ids = [store(event_store, "s1", make_message(i)) for i in range(5)]
+    store(event_store, "s2", make_message(100))
+    assert len(set(ids)) == 5
+
+    stream_id, sent = replay(event_store, ids[2])
+    assert stream_id == "s1"
+    assert sent == [(ids[3], 3), (ids[4], 4)]
+    assert replay(event_store, ids[4]) == ("s1", [])
+    # Dropped from the stream, or never stored
+    assert replay(event_store, ids[1]) == (None, [])
+    assert replay(event_store, "unknown") == (None, [])
+    assert replay(event_store, "0-99") == (None, [])
+    assert event_store.stats()["events"] == 4
+
+
+def test_least_recently_used_streams_are_evicted_over_budget():
+    size = len(make_message(0, "x" * 100).model_dump_json(exclude_none=True))
+    event_store = InMemoryEventStore(max_bytes=size * 3)
+    first = store(event_store, "s1", make_message(0, "x" * 100))
+    store(event_store, "s2", make_message(1, "x" * 100))
+    store(event_store, "s3", make_message(2, "x" * 100))
+    # Replaying s1 makes s2 the least recently used stream
+    assert replay(event_store, first)[0] == "s1"
+    store(event_store, "s4", make_message(3, "x" * 100))
+    assert list(event_store.streams) == ["s3", "s1", "s4"]
+    assert event_store.stats() == {"streams": 3, "events": 3, "bytes": size * 3}
+
+    # A single stream over budget keeps its most recent events
+    for i in range(5):
+        last = store(event_store, "s5", make_message(i, "x" * 100))
+    assert list(event_store.streams) == ["s5"]
+    assert event_store.stats()["events"] == 3
+    assert replay(event_store, last) == ("s5", [])
+
+
+def test_idle_streams_are_evicted():
+    event_store = InMemoryEventStore(max_idle_seconds=60)
+    with mock.patch("databricks.labs.mcp.base.time.monotonic", return_value=0):
+        store(event_store, "s1", make_message(0))
+        store(event_store, "s2", make_message(1))
+    with mock.patch("databricks.labs.mcp.base.time.monotonic", return_value=30):
+        store(event_store, "s2", make_message(2))
+    with mock.patch("databricks.labs.mcp.base.time.monotonic", return_value=61):
+        store(event_store, "s3", make_message(3))
+    assert list(event_store.streams) == ["s2", "s3"]
+    assert event_store.stats()["events"] == 3
+
+
+def test_stateless_app_serves_requests_without_session():
+    server = Server("test")
+
+    @server.list_tools()
+    async def list_tools():
+        return [types.Tool(name="t", description="d", inputSchema={"type": "object"})]
+
+    app = get_serveable_app(server, stateless=True)
+    headers = {
+        "Accept": "application/json, text/event-stream",
+        "Content-Type": "application/json",
+    }
+    with TestClient(app) as client:
+        # Any worker can handle any request, no initialization or session ID needed
+        for request_id in range(2):
+            response = client.post(
+                "/mcp/",
+                json={"jsonrpc": "2.0", "id": request_id, "method": "tools/list"},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            assert "mcp-session-id" not in response.headers
+            assert response.json()["result"]["tools"][0]["name"] == "t"
+
+
+def test_app_serves_mount_path_with_and_without_trailing_slash():
+    server = Server("test")
+
+    @server.list_tools()
+    async def list_tools():
+        return []
+
+    async def index(request):
+        return JSONResponse({"index": True})
+
+    app = get_serveable_app(
+        server,
+        stateless=True,
+        mount_path="/api/mcp",
+        routes=[Mount("/", routes=[Route("/{path:path}", index)])],
+    )
+    headers = {
+        "Accept": "application/json, text/event-stream",
+        "Content-Type": "application/json",
+    }
+    with TestClient(app, follow_redirects=False) as client:
+        for path in ["/api/mcp", "/api/mcp/"]:
+            response = client.post(
+                path,
+                json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            assert response.json()["result"]["tools"] == []
+        # Other paths still reach the catch-all route
+        assert client.get("/index.html").json() == {"index": True}
+
+
+def test_accepted_encodings():
+    assert _get_accepted_encodings("gzip, deflate, br, zstd") == {
+        "gzip",
+        "deflate",
+        "br",
+        "zstd",
+    }
+    assert _get_accepted_encodings("zstd;q=0, GZIP;q=0.5") == {"gzip"}
+    assert _get_accepted_encodings("") == {""}
+
+
+PAYLOAD = {"rows": [["value"] * 10] * 100}
+
+
+def make_compressed_client(minimum_size: int = 100) -> TestClient:
+    async def endpoint(request):
+        return JSONResponse(PAYLOAD)
+
+    async def small_endpoint(request):
+        return JSONResponse({"ok": True})
+
+    async def streaming_endpoint(request):
+        async def chunks():
+            for i in range(3):
+                yield f"chunk {i} ".encode() * 100
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = Starlette(
+        routes=[
+            Route("/", endpoint),
+            Route("/small", small_endpoint),
+            Route("/streaming", streaming_endpoint),
+        ],
+    )
+    return TestClient(CompressionMiddleware(app, minimum_size=minimum_size))
+
+
+def test_compression_middleware_negotiates_encoding():
+    client = make_compressed_client()
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == PAYLOAD
+
+    response = client.get("/streaming", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"chunk {i} " * 100 for i in range(3))
+
+    response = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == PAYLOAD
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_compression_middleware_prefers_zstd():
+    pytest.importorskip("zstandard")
+    client = make_compressed_client()
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip, zstd"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.json() == PAYLOAD
+
+    response = client.get("/streaming", headers={"Accept-Encoding": "zstd"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.text == "".join(f"chunk {i} " * 100 for i in range(3))
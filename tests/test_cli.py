@@ -42,6 +42,15 @@ def test_arguments(catalog: str, schema: str) -> None:
     [
         ["unitycatalog-mcp"],  # neither -s nor -g
         ["unitycatalog-mcp", "-s", "schema_no_catalog"],
+        ["unitycatalog-mcp", "-s", "catalog.schema,schema_no_catalog"],
+        ["unitycatalog-mcp", "-s", "catalog."],
+        [
+            "unitycatalog-mcp",
+            "-s",
+            "catalog.schema",
+            "--uc_function_result_cache_ttl_overrides",
+            "catalog.schema.f=soon",
+        ],
     ],
 )
 def test_required_arguments(argv) -> None:
@@ -82,3 +91,19 @@ def test_valid_combinations(
         assert settings.get_catalog_name() == expected_catalog
         assert settings.get_schema_name() == expected_schema
         assert settings.genie_space_ids == expected_genie_space_ids
+
+
+@pytest.mark.parametrize(
+    "schema_full_name,expected_patterns",
+    [
+        ("main.default", ["main.default"]),
+        ("a.b,c.d", ["a.b", "c.d"]),
+        ("main.*", ["main.*"]),
+        ("a.b, dev_*.sales_?", ["a.b", "dev_*.sales_?"]),
+    ],
+)
+def test_schema_patterns(schema_full_name, expected_patterns) -> None:
+    argv = ["unitycatalog-mcp", "-s", schema_full_name]
+    with patch.object(sys, "argv", argv):
+        settings = get_settings()
+        assert settings.get_schema_patterns() == expected_patterns
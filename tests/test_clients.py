@@ -0,0 +1,39 @@
+from unittest import mock
+
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import ClientRegistry
+
+
+class DummyRegistry(ClientRegistry):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = 0
+
+    def _create_vector_search_client(self):
+        self.created += 1
+        return f"client-{self.created}"
+
+    def _configure_vector_search_pool(self):
+        pass
+
+
+@mock.patch("databricks.labs.mcp.servers.unity_catalog.tools.clients.Config")
+@mock.patch("databricks.labs.mcp.servers.unity_catalog.tools.clients.WorkspaceClient")
+def test_workspace_client_is_created_once(MockWorkspaceClient, MockConfig):
+    registry = ClientRegistry(max_connections_per_host=7)
+    assert registry.get_workspace_client() is registry.get_workspace_client()
+    assert MockWorkspaceClient.call_count == 1
+    assert MockConfig.call_args.kwargs["max_connections_per_pool"] == 7
+    assert MockConfig.call_args.kwargs["disable_async_token_refresh"] is False
+
+
+def test_vector_search_client_is_reused_until_stale():
+    registry = DummyRegistry(credential_refresh_seconds=60)
+    assert registry.get_vector_search_client() == "client-1"
+    assert registry.get_vector_search_client() == "client-1"
+    assert registry.created == 1
+
+    registry._vector_search_client_created_at -= 61
+    # the stale client is still served while the refresh runs in the background
+    assert registry.get_vector_search_client() == "client-1"
+    registry._refresh_pool.shutdown(wait=True)
+    assert registry.get_vector_search_client() == "client-2"
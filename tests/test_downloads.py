@@ -0,0 +1,122 @@
+import os
+import time
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+from databricks.sdk.service.sql import (
+    ColumnInfo,
+    ColumnInfoTypeName,
+    Format,
+    ResultData,
+    ResultManifest,
+    ResultSchema,
+    StatementResponse,
+)
+
+from databricks.labs.mcp.servers.unity_catalog.tools.downloads import (
+    DownloadStore,
+    iter_result_batches,
+)
+
+
+def make_statement():
+    chunks = [
+        ResultData(
+            chunk_index=0,
+            data_array=[["1", "a", None], ["2", "b", "1.5"]],
+            next_chunk_index=1,
+        ),
+        ResultData(chunk_index=1, data_array=[["3", None, "-2.0"]]),
+    ]
+    statement = StatementResponse(
+        statement_id="stmt",
+        manifest=ResultManifest(
+            format=Format.JSON_ARRAY,
+            schema=ResultSchema(
+                columns=[
+                    ColumnInfo(name="id", type_name=ColumnInfoTypeName.LONG),
+                    ColumnInfo(name="name", type_name=ColumnInfoTypeName.STRING),
+                    ColumnInfo(name="value", type_name=ColumnInfoTypeName.DOUBLE),
+                ]
+            ),
+        ),
+        result=chunks[0],
+    )
+    client = mock.Mock()
+    client.statement_execution.get_statement_result_chunk_n.side_effect = (
+        lambda statement_id, chunk_index: chunks[chunk_index]
+    )
+    return client, statement
+
+
+def test_iter_result_batches_reads_all_chunks():
+    client, statement = make_statement()
+
+    batches = list(iter_result_batches(client, statement))
+
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert batches[0].schema.field("id").type == pa.int64()
+    assert batches[1].column(2).to_pylist() == [-2.0]
+
+
+def test_download_store_round_trip(tmp_path):
+    client, statement = make_statement()
+    store = DownloadStore(tmp_path)
+
+    summary = store.write("download-1", iter_result_batches(client, statement))
+
+    assert summary["row_count"] == 3
+    assert summary["columns"] == [
+        {"name": "id", "type": "int64", "null_count": 0, "min": 1, "max": 3},
+        {"name": "name", "type": "string", "null_count": 1, "min": "a", "max": "b"},
+        {"name": "value", "type": "double", "null_count": 1, "min": -2.0, "max": 1.5},
+    ]
+    assert store.read("download-1", 1, 10) == {
+        "download_id": "download-1",
+        "columns": ["id", "name", "value"],
+        "row_count": 3,
+        "row_offset": 1,
+        "rows": [[2, "b", 1.5], [3, None, -2.0]],
+    }
+    assert store.read("download-1", 0, 1, columns=["name"])["rows"] == [["a"]]
+
+
+def test_download_store_rejects_unknown_downloads(tmp_path):
+    store = DownloadStore(tmp_path)
+    with pytest.raises(ValueError, match="was not fetched"):
+        store.read("missing", 0, 10)
+    with pytest.raises(ValueError, match="Invalid download ID"):
+        store.get_path("../etc/passwd")
+
+
+def write_download(store, download_id, age_seconds):
+    client, statement = make_statement()
+    store.write(download_id, iter_result_batches(client, statement))
+    mtime = time.time() - age_seconds
+    os.utime(store.get_path(download_id), (mtime, mtime))
+
+
+def test_download_store_deletes_expired_downloads(tmp_path):
+    store = DownloadStore(tmp_path, retention_seconds=3600)
+    write_download(store, "old", age_seconds=7200)
+    write_download(store, "recent", age_seconds=60)
+
+    write_download(store, "new", age_seconds=0)
+
+    assert sorted(path.stem for path in tmp_path.glob("*.arrow")) == ["new", "recent"]
+    with pytest.raises(ValueError, match="has expired"):
+        store.read("old", 0, 10)
+
+
+def test_download_store_deletes_least_recently_read_downloads(tmp_path):
+    store = DownloadStore(tmp_path)
+    write_download(store, "d1", age_seconds=300)
+    write_download(store, "d2", age_seconds=200)
+    # Reading a download makes it the most recently used one
+    store.read("d1", 0, 1)
+    store.max_bytes = store.get_path("d1").stat().st_size * 2
+
+    write_download(store, "d3", age_seconds=0)
+
+    assert sorted(path.stem for path in tmp_path.glob("*.arrow")) == ["d1", "d3"]
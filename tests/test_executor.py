@@ -0,0 +1,185 @@
+import threading
+
+import anyio
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import (
+    SingleFlight,
+    ToolExecutor,
+)
+from mcp.types import Tool as ToolSpec
+
+
+class BlockingTool(BaseTool):
+    family = "slow"
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+        super().__init__(ToolSpec(name="blocking", inputSchema={}))
+
+    def execute(self, **kwargs):
+        self.release.wait(timeout=5)
+        return kwargs
+
+
+def test_execute_runs_tool_off_the_event_loop():
+    executor = ToolExecutor(limits={"slow": 1})
+    release = threading.Event()
+    tool = BlockingTool(release)
+
+    async def main():
+        results = []
+
+        async def call(x):
+            results.append(await executor.execute(tool, {"x": x}))
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(call, 1)
+            tg.start_soon(call, 2)
+            await anyio.sleep(0.1)
+            # the event loop is still responsive and the second call is queued
+            assert executor.stats()["slow"] == {"limit": 1, "in_flight": 1, "queued": 1}
+            release.set()
+        return results
+
+    results = anyio.run(main)
+    assert sorted(r["x"] for r in results) == [1, 2]
+    assert executor.stats()["slow"]["in_flight"] == 0
+
+
+def test_tool_arguments_do_not_clash_with_run_sync_parameters():
+    executor = ToolExecutor(limits={})
+    release = threading.Event()
+    release.set()
+    tool = BlockingTool(release)
+
+    result = anyio.run(lambda: executor.execute(tool, {"family": "a", "func": "b"}))
+
+    assert result == {"family": "a", "func": "b"}
+
+
+def test_families_have_independent_limits():
+    executor = ToolExecutor(limits={"genie": 1, "vector_search": 2}, default_limit=3)
+    assert executor.get_limiter("genie").total_tokens == 1
+    assert executor.get_limiter("vector_search").total_tokens == 2
+    assert executor.get_limiter("other").total_tokens == 3
+    assert set(executor.stats()) == {"genie", "vector_search", "other"}
+
+
+class CountingTool(BaseTool):
+    family = "counting"
+
+    def __init__(self, release: threading.Event, coalesce_calls=True):
+        self.release = release
+        self.calls = 0
+        self.coalesce_calls = coalesce_calls
+        super().__init__(ToolSpec(name="counting", inputSchema={}))
+
+    def execute(self, **kwargs):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return [self.calls]
+
+
+def run_concurrently(executor, tool, arguments_list):
+    async def main():
+        results = []
+
+        async def call(arguments):
+            results.append(await executor.execute(tool, arguments))
+
+        async with anyio.create_task_group() as tg:
+            for arguments in arguments_list:
+                tg.start_soon(call, arguments)
+            await anyio.sleep(0.1)
+            tool.release.set()
+        return results
+
+    return anyio.run(main)
+
+
+def test_identical_concurrent_calls_are_coalesced():
+    executor = ToolExecutor(limits={})
+    tool = CountingTool(threading.Event())
+
+    results = run_concurrently(
+        executor, tool, [{"a": 1, "b": [2]}, {"b": [2], "a": 1}, {"a": 2, "b": [2]}]
+    )
+
+    assert tool.calls == 2
+    assert len(results) == 3
+    assert executor.single_flight.coalesced_calls == 1
+
+
+def test_tools_can_opt_out_of_coalescing():
+    executor = ToolExecutor(limits={})
+    tool = CountingTool(threading.Event(), coalesce_calls=False)
+
+    run_concurrently(executor, tool, [{"a": 1}, {"a": 1}])
+
+    assert tool.calls == 2
+    assert executor.single_flight.coalesced_calls == 0
+
+
+def test_coalesced_calls_share_errors():
+    executor = ToolExecutor(limits={})
+
+    class FailingTool(CountingTool):
+        def execute(self, **kwargs):
+            super().execute(**kwargs)
+            raise ValueError("boom")
+
+    tool = FailingTool(threading.Event())
+
+    async def main():
+        errors = []
+
+        async def call():
+            try:
+                await executor.execute(tool, {})
+            except ValueError as e:
+                errors.append(e)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(call)
+            tg.start_soon(call)
+            await anyio.sleep(0.1)
+            tool.release.set()
+        return errors
+
+    first, second = anyio.run(main)
+    assert tool.calls == 1
+    # Each waiter raises its own copy, chained to the error of the shared call
+    assert str(first) == str(second) == "boom"
+    assert second is not first and second.__cause__ is first
+
+
+def test_waiting_call_runs_itself_when_shared_call_is_cancelled():
+    single_flight = SingleFlight()
+    runs = []
+
+    async def func():
+        runs.append(len(runs))
+        await anyio.sleep(0.1)
+        return len(runs)
+
+    async def main():
+        results = []
+        leader_scope = anyio.CancelScope()
+
+        async def leader():
+            with leader_scope:
+                await single_flight.run("key", func)
+
+        async def follower():
+            results.append(await single_flight.run("key", func))
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(leader)
+            await anyio.sleep(0.01)
+            tg.start_soon(follower)
+            await anyio.sleep(0.01)
+            leader_scope.cancel()
+        return results
+
+    assert anyio.run(main) == [2]
+    assert len(runs) == 2
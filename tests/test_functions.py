@@ -1,8 +1,16 @@
+import json
 from unittest import mock
 
+import anyio
 import pytest
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import ToolExecutor
 from databricks.labs.mcp.servers.unity_catalog.tools.functions import (
+    FunctionResultCache,
+    _get_function_result_cache_ttl_seconds,
+    _list_uc_function_tools,
     list_uc_function_tools,
+    with_batch_tools,
+    UCFunctionBatchTool,
     UCFunctionTool,
 )
 
@@ -13,9 +21,9 @@ class DummyToolkit:
     def __init__(self, client, function_names):
         self.client = client
         self.function_names = function_names
-        if function_names != [f"{SCHEMA_FULL_NAME}.*"]:
-            raise ValueError(f"Expected function names to be ['{SCHEMA_FULL_NAME}.*']")
-        self.tools_dict = {
+        if any(not name.startswith(f"{SCHEMA_FULL_NAME}.") for name in function_names):
+            raise ValueError(f"Expected functions of the '{SCHEMA_FULL_NAME}' schema")
+        all_tools = {
             "catalog.schema.func1": {
                 "function": {
                     "name": "catalog__schema__func1",
@@ -31,9 +39,27 @@ class DummyToolkit:
                 }
             },
         }
+        self.tools_dict = {name: all_tools[name] for name in function_names}
+
+
+class DummyFunctionInfo:
+    def __init__(self, full_name):
+        self.full_name = full_name
+
+
+class DummyPage(list):
+    def __init__(self, items, token):
+        super().__init__(items)
+        self.token = token
 
 
 class DummyClient:
+    def list_functions(self, catalog, schema, page_token=None, include_browse=None):
+        assert f"{catalog}.{schema}" == SCHEMA_FULL_NAME
+        if page_token is None:
+            return DummyPage([DummyFunctionInfo("catalog.schema.func1")], "next")
+        return DummyPage([DummyFunctionInfo("catalog.schema.func2")], None)
+
     def execute_function(self, function_name, parameters):
         class Result:
             def __init__(self, value, error):
@@ -51,10 +77,13 @@ class DummyClient:
 
 class DummySettings:
     schema_full_name = SCHEMA_FULL_NAME
+    discovery_max_concurrency = 4
+    uc_function_result_cache_ttl_seconds = 3600
+    uc_function_result_cache_ttl_overrides = []
 
 
 @mock.patch(
-    "databricks.labs.mcp.servers.unity_catalog.tools.functions.DatabricksFunctionClient",
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions.get_function_client",
     new=DummyClient,
 )
 @mock.patch(
@@ -63,11 +92,37 @@ class DummySettings:
 )
 def test_list_uc_function_tools():
     settings = DummySettings()
-    tools = list_uc_function_tools(settings)
+    tools = list_uc_function_tools(settings, SCHEMA_FULL_NAME)
     assert len(tools) == 2
     assert all(isinstance(t, UCFunctionTool) for t in tools)
-    orig_uc_names = {t.uc_function_name for t in tools}
-    assert orig_uc_names == {"catalog.schema.func1", "catalog.schema.func2"}
+    orig_uc_names = [t.uc_function_name for t in tools]
+    assert orig_uc_names == ["catalog.schema.func1", "catalog.schema.func2"]
+    assert [t.tool_spec.name for t in tools] == [
+        "catalog__schema__func1",
+        "catalog__schema__func2",
+    ]
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions.UCFunctionToolkit",
+)
+def test_uc_function_tool_spec_is_fetched_lazily(MockToolkit):
+    MockToolkit.return_value.tools_dict = {
+        "catalog.schema.func1": {
+            "function": {
+                "name": "catalog__schema__func1",
+                "description": "desc1",
+                "parameters": {},
+            }
+        }
+    }
+    tool = UCFunctionTool(None, DummyClient(), "catalog.schema.func1")
+    assert tool.name == "catalog__schema__func1"
+    MockToolkit.assert_not_called()
+
+    assert tool.tool_spec.description == "desc1"
+    assert tool.tool_spec.description == "desc1"
+    MockToolkit.assert_called_once()
 
 
 def test_uc_function_tool_execute():
@@ -79,3 +134,161 @@ def test_uc_function_tool_execute():
     with pytest.raises(Exception) as excinfo:
         tool.execute(x=3)
     assert "Missing required parameter 'required_parameter'" in str(excinfo.value)
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions.UCFunctionToolkit",
+    new=DummyToolkit,
+)
+def test_list_uc_function_tools_reuses_unchanged_functions():
+    class VersionedClient(DummyClient):
+        def list_functions(self, catalog, schema, page_token=None, include_browse=None):
+            page = super().list_functions(catalog, schema, page_token, include_browse)
+            for f in page:
+                f.updated_at = 2 if f.full_name.endswith("func2") else 1
+            return page
+
+    client = VersionedClient()
+    unchanged = UCFunctionTool(
+        {"function": {"name": "f1", "description": "", "parameters": {}}},
+        client,
+        "catalog.schema.func1",
+        updated_at=1,
+    )
+    changed = UCFunctionTool(
+        {"function": {"name": "f2", "description": "", "parameters": {}}},
+        client,
+        "catalog.schema.func2",
+        updated_at=1,
+    )
+
+    tools = _list_uc_function_tools(
+        client, "catalog", "schema", previous_tools=[unchanged, changed]
+    )
+
+    assert tools[0] is unchanged
+    assert tools[1] is not changed
+    assert tools[1].tool_spec.name == "catalog__schema__func2"
+    assert tools[1].updated_at == 2
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions.get_tool_executor",
+    new=lambda: ToolExecutor(limits={}),
+)
+def test_uc_function_batch_tool():
+    dummy_func = {
+        "function": {
+            "name": "foo",
+            "description": "bar",
+            "parameters": {"type": "object"},
+        }
+    }
+    batch_tool = UCFunctionBatchTool(UCFunctionTool(dummy_func, DummyClient(), "foo"))
+    assert batch_tool.name == "foo_batch"
+    assert batch_tool.is_async
+    assert batch_tool.tool_spec.inputSchema["properties"]["calls"]["items"] == {
+        "type": "object"
+    }
+
+    calls = [
+        {"required_parameter": 1},
+        {"x": 3},
+        {"required_parameter": 2, "family": "a", "func": "b"},
+    ]
+    output = anyio.run(lambda: batch_tool.aexecute(calls=calls))
+    results = json.loads(output[0].text)
+    assert results[0] == {
+        "value": "executed foo with parameters {'required_parameter': 1}"
+    }
+    assert "Missing required parameter" in results[1]["error"]
+    assert results[2] == {
+        "value": "executed foo with parameters "
+        "{'required_parameter': 2, 'family': 'a', 'func': 'b'}"
+    }
+    with pytest.raises(ValueError):
+        anyio.run(lambda: batch_tool.aexecute(calls=[]))
+
+
+def test_uc_function_batch_tool_name_is_bounded():
+    # The tool name of the function is already 64 characters long
+    function_name = "catalog.schema." + "f" * 47
+    tool = UCFunctionTool(None, DummyClient(), function_name)
+    other_tool = UCFunctionTool(None, DummyClient(), function_name[:-1] + "g")
+    assert len(tool.name) == 64
+
+    batch_name = UCFunctionBatchTool(tool).name
+    assert len(batch_name) == 64
+    assert batch_name.startswith("catalog__schema__fff")
+    assert batch_name != UCFunctionBatchTool(other_tool).name
+
+
+def test_uc_function_batch_tool_hoists_schema_definitions():
+    parameters = {
+        "type": "object",
+        "properties": {"point": {"$ref": "#/$defs/Point"}},
+        "$defs": {"Point": {"type": "object", "properties": {"x": {}}}},
+    }
+    dummy_func = {
+        "function": {"name": "foo", "description": "bar", "parameters": parameters}
+    }
+    batch_tool = UCFunctionBatchTool(UCFunctionTool(dummy_func, DummyClient(), "foo"))
+
+    input_schema = batch_tool.tool_spec.inputSchema
+    assert input_schema["$defs"] == parameters["$defs"]
+    assert input_schema["properties"]["calls"]["items"] == {
+        "type": "object",
+        "properties": {"point": {"$ref": "#/$defs/Point"}},
+    }
+    # The function tool keeps its own schema
+    assert "$defs" in batch_tool.function_tool.tool_spec.inputSchema
+
+
+def test_with_batch_tools():
+    tool = UCFunctionTool(None, DummyClient(), "catalog.schema.func1")
+    settings = mock.Mock(uc_function_batch_tools=True)
+    assert [t.name for t in with_batch_tools([tool], settings)] == [
+        "catalog__schema__func1",
+        "catalog__schema__func1_batch",
+    ]
+    settings.uc_function_batch_tools = False
+    assert with_batch_tools([tool], settings) == [tool]
+
+
+def test_deterministic_function_results_are_cached():
+    cache = FunctionResultCache(max_bytes=1024)
+    client = mock.Mock(wraps=DummyClient())
+    dummy_func = {"function": {"name": "foo", "description": "bar", "parameters": {}}}
+    deterministic = UCFunctionTool(
+        dummy_func, client, "foo", is_deterministic=True, result_cache_ttl_seconds=60
+    )
+    assert deterministic.coalesce_calls
+    with mock.patch(
+        "databricks.labs.mcp.servers.unity_catalog.tools.functions."
+        "get_function_result_cache",
+        return_value=cache,
+    ):
+        first = deterministic.execute(required_parameter=1, other="a")
+        second = deterministic.execute(other="a", required_parameter=1)
+        assert first == second
+        assert client.execute_function.call_count == 1
+        deterministic.execute(required_parameter=2)
+        assert client.execute_function.call_count == 2
+        # Errors are not cached
+        for _ in range(2):
+            with pytest.raises(Exception):
+                deterministic.execute(x=3)
+        assert client.execute_function.call_count == 4
+
+        # Results of non deterministic functions are never cached
+        tool = UCFunctionTool(dummy_func, client, "foo", result_cache_ttl_seconds=60)
+        assert not tool.coalesce_calls
+        tool.execute(required_parameter=1)
+        assert client.execute_function.call_count == 5
+
+
+def test_result_cache_ttl_overrides():
+    overrides = ["main.sales.*=60", "main.*=0"]
+    assert _get_function_result_cache_ttl_seconds("main.sales.f", 3600, overrides) == 60
+    assert _get_function_result_cache_ttl_seconds("main.hr.f", 3600, overrides) == 0
+    assert _get_function_result_cache_ttl_seconds("other.hr.f", 3600, overrides) == 3600
@@ -1,10 +1,53 @@
+import functools
+import json
+import threading
+import time
+
+import anyio
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.types import TextContent
 from pydantic import BaseModel
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import ToolExecutor
 from databricks.labs.mcp.servers.unity_catalog.tools.genie import (
     list_genie_tools,
     GenieTool,
+    PollMessageUntilCompleteInput,
+    _ask_spaces,
+    GenieResultCache,
+    SpaceCache,
+    _execute_attachment_query,
+    _get_attachment_query_result,
+    _get_message,
+    _fetch_download,
+    _get_query_result_page,
+    _next_poll_interval,
+    _poll_message_until_complete,
+    _report_progress,
+    _encode_page_token,
     dump_json,
+    MAX_QUERY_RESULT_ROW_LIMIT,
 )
 from unittest import mock
+from databricks.sdk.service.dashboards import GenieMessage, MessageStatus
+from databricks.sdk.service.sql import (
+    BaseChunkInfo,
+    ResultData,
+    ResultManifest,
+    StatementResponse,
+    StatementState,
+    StatementStatus,
+)
+
+
+@pytest.fixture(autouse=True)
+def genie_result_cache():
+    cache = GenieResultCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    with mock.patch(
+        "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_genie_result_cache",
+        return_value=cache,
+    ):
+        yield cache
 
 
 class DummySettings:
@@ -26,6 +69,7 @@ def test_list_genie_tools_names_and_types():
         "genie_generate_download",
         "genie_poll_until_complete",
         "genie_list_spaces",
+        "genie_ask_spaces",
     }
     assert expected.issubset(names)
 
@@ -64,7 +108,7 @@ class DummyWorkspaceClient:
 
 
 @mock.patch(
-    "databricks.labs.mcp.servers.unity_catalog.tools.genie.WorkspaceClient",
+    "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_workspace_client",
     new=DummyWorkspaceClient,
 )
 def test_genie_tool_execute():
@@ -74,3 +118,386 @@ def test_genie_tool_execute():
     result = tool.execute()
     assert isinstance(result, list)
     assert result[0].text == "hello world"
+
+
+class DummyMessage:
+    def __init__(self, status):
+        self.message_id = "m1"
+        self.status = mock.Mock(value=status)
+
+    def as_dict(self):
+        return {"message_id": self.message_id, "status": self.status.value}
+
+
+class DummyGenieAPI:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get_message(self, space_id, conversation_id, message_id):
+        self.calls += 1
+        return DummyMessage(self.statuses.pop(0) if self.statuses else "COMPLETED")
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_tool_executor",
+    new=lambda: ToolExecutor(limits={}),
+)
+def test_poll_message_until_complete_backs_off_and_stops_on_terminal_status():
+    client = mock.Mock()
+    client.genie = DummyGenieAPI(["SUBMITTED", "ASKING_AI", "ASKING_AI", "COMPLETED"])
+    args = {
+        "space_id": "s1",
+        "conversation_id": "c1",
+        "message_id": "m1",
+        "initial_poll_interval_seconds": 0.01,
+        "poll_interval_seconds": 0.02,
+    }
+    result = anyio.run(_poll_message_until_complete, client, args)
+    payload = json.loads(result[0].text)
+    assert payload["status"] == "COMPLETED"
+    assert payload["poll_count"] == 4
+    assert client.genie.calls == 4
+
+
+def test_next_poll_interval():
+    model = PollMessageUntilCompleteInput(
+        space_id="s",
+        conversation_id="c",
+        message_id="m",
+        initial_poll_interval_seconds=1,
+        poll_interval_seconds=2,
+    )
+    assert _next_poll_interval(model, 1, status_changed=False) == 1.5
+    assert _next_poll_interval(model, 1.5, status_changed=False) == 2
+    assert _next_poll_interval(model, 2, status_changed=True) == 1
+
+
+def test_async_genie_tool_is_dispatched_on_event_loop():
+    async def func(client, args):
+        return [TextContent(type="text", text="done")]
+
+    tool = GenieTool("foo", "desc", {"type": "object", "properties": {}}, func)
+    assert tool.is_async
+    executor = ToolExecutor(limits={})
+    with (
+        mock.patch(
+            "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_tool_executor",
+            return_value=executor,
+        ),
+        mock.patch(
+            "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_workspace_client",
+            new=DummyWorkspaceClient,
+        ),
+    ):
+        result = anyio.run(executor.execute, tool, {})
+    assert result[0].text == "done"
+
+
+def test_report_progress_uses_request_progress_token():
+    session = mock.AsyncMock()
+    ctx = mock.Mock(request_id=7, session=session)
+    ctx.meta.progressToken = "token"
+    token = request_ctx.set(ctx)
+    try:
+        anyio.run(
+            functools.partial(_report_progress, 1.5, total=10, message="ASKING_AI")
+        )
+    finally:
+        request_ctx.reset(token)
+    session.send_progress_notification.assert_awaited_once_with(
+        "token", 1.5, total=10, message="ASKING_AI", related_request_id="7"
+    )
+
+
+def make_statement(chunk_rows):
+    """A statement whose result is split in chunks of the given row counts."""
+    chunks = []
+    row_offset = 0
+    for index, count in enumerate(chunk_rows):
+        chunks.append(
+            ResultData(
+                chunk_index=index,
+                row_offset=row_offset,
+                row_count=count,
+                data_array=[[str(i)] for i in range(row_offset, row_offset + count)],
+                next_chunk_index=index + 1 if index + 1 < len(chunk_rows) else None,
+            )
+        )
+        row_offset += count
+    statement = StatementResponse(
+        statement_id="stmt",
+        manifest=ResultManifest(
+            total_row_count=row_offset,
+            chunks=[
+                BaseChunkInfo(
+                    chunk_index=c.chunk_index,
+                    row_offset=c.row_offset,
+                    row_count=c.row_count,
+                )
+                for c in chunks
+            ],
+        ),
+        result=chunks[0],
+    )
+    client = mock.Mock()
+    client.genie.execute_message_attachment_query.return_value.statement_response = (
+        statement
+    )
+    client.statement_execution.get_statement_result_chunk_n.side_effect = (
+        lambda statement_id, chunk_index: chunks[chunk_index]
+    )
+    return client
+
+
+ATTACHMENT_ARGS = {
+    "space_id": "s",
+    "conversation_id": "c",
+    "message_id": "m",
+    "attachment_id": "a",
+}
+
+
+def test_query_result_is_paged_across_chunks():
+    client = make_statement([3, 3, 2])
+
+    page = json.loads(
+        _execute_attachment_query(client, {**ATTACHMENT_ARGS, "row_limit": 4})[0].text
+    )
+    assert page["total_row_count"] == 8
+    assert page["rows"] == [["0"], ["1"], ["2"], ["3"]]
+
+    rows = page["rows"]
+    while page["next_page_token"]:
+        page = json.loads(
+            _get_query_result_page(client, {"page_token": page["next_page_token"]})[
+                0
+            ].text
+        )
+        rows += page["rows"]
+    assert rows == [[str(i)] for i in range(8)]
+    # Every chunk was fetched once, the query was not executed again
+    fetched = client.statement_execution.get_statement_result_chunk_n.call_args_list
+    assert [c.args[1] for c in fetched] == [1, 1, 2]
+    client.genie.execute_message_attachment_query.assert_called_once()
+
+
+def test_query_result_starts_at_row_offset():
+    client = make_statement([3, 3, 2])
+
+    page = json.loads(
+        _execute_attachment_query(
+            client, {**ATTACHMENT_ARGS, "row_offset": 6, "row_limit": 10}
+        )[0].text
+    )
+
+    assert page["rows"] == [["6"], ["7"]]
+    assert page["next_page_token"] is None
+
+
+def test_query_result_without_chunk_indexes_is_not_fetched_again():
+    client = make_statement([3])
+    statement = client.genie.execute_message_attachment_query.return_value
+    statement.statement_response.result.chunk_index = None
+    statement.statement_response.manifest.chunks[0].chunk_index = None
+
+    page = json.loads(
+        _execute_attachment_query(client, {**ATTACHMENT_ARGS, "row_limit": 2})[0].text
+    )
+
+    assert page["rows"] == [["0"], ["1"]]
+    client.statement_execution.get_statement_result_chunk_n.assert_not_called()
+
+
+def test_invalid_page_token():
+    with pytest.raises(ValueError, match="Invalid page token"):
+        _get_query_result_page(mock.Mock(), {"page_token": "not-a-token"})
+
+
+@pytest.mark.parametrize(
+    "row_offset,chunk_index,row_limit",
+    [(-1, 0, 10), (0, -1, 10), (0, 0, 0), (0, 0, MAX_QUERY_RESULT_ROW_LIMIT + 1)],
+)
+def test_out_of_bounds_page_token(row_offset, chunk_index, row_limit):
+    page_token = _encode_page_token("stmt", row_offset, chunk_index, row_limit)
+    client = mock.Mock()
+    with pytest.raises(ValueError, match="Invalid page token"):
+        _get_query_result_page(client, {"page_token": page_token})
+    client.statement_execution.get_statement_result_chunk_n.assert_not_called()
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_download_store",
+)
+def test_fetch_download_waits_for_pending_downloads(MockStore):
+    client = mock.Mock()
+    client.genie.get_download_full_query_result.return_value.statement_response = (
+        StatementResponse(status=StatementStatus(state=StatementState.RUNNING))
+    )
+
+    result = json.loads(
+        _fetch_download(client, {**ATTACHMENT_ARGS, "download_id": "d1"})[0].text
+    )
+
+    assert result["state"] == "RUNNING"
+    MockStore.return_value.write.assert_not_called()
+
+
+def test_result_cache_only_keeps_terminal_messages(genie_result_cache):
+    client = mock.Mock()
+    statuses = iter(["EXECUTING_QUERY", "COMPLETED", "EXECUTING_QUERY"])
+    client.genie.get_message.side_effect = lambda *_: GenieMessage(
+        id="m",
+        message_id="m",
+        space_id="s",
+        conversation_id="c",
+        content="q",
+        status=MessageStatus(next(statuses)),
+    )
+    args = {"space_id": "s", "conversation_id": "c", "message_id": "m"}
+
+    statuses_seen = [
+        json.loads(_get_message(client, args)[0].text)["status"] for _ in range(3)
+    ]
+
+    assert statuses_seen == ["EXECUTING_QUERY", "COMPLETED", "COMPLETED"]
+    assert client.genie.get_message.call_count == 2
+
+
+def test_result_cache_query_results_and_reruns(genie_result_cache):
+    client = make_statement([2])
+    client.genie.execute_message_attachment_query.return_value.statement_response.status = StatementStatus(
+        state=StatementState.SUCCEEDED
+    )
+
+    _execute_attachment_query(client, ATTACHMENT_ARGS)
+    _get_attachment_query_result(client, ATTACHMENT_ARGS)
+    _execute_attachment_query(client, ATTACHMENT_ARGS)
+
+    # The re-run result is served to genie_get_query_result, re-runs are not cached
+    client.genie.get_message_attachment_query_result.assert_not_called()
+    assert client.genie.execute_message_attachment_query.call_count == 2
+
+    genie_result_cache.execute_query_staleness_seconds = 60
+    _execute_attachment_query(client, ATTACHMENT_ARGS)
+    _execute_attachment_query(client, ATTACHMENT_ARGS)
+    assert client.genie.execute_message_attachment_query.call_count == 3
+
+
+class DummySpace:
+    def __init__(self, title):
+        self.title = title
+        self.description = None
+
+
+def test_space_cache_fetches_concurrently_and_refreshes_in_background():
+    fetched = []
+    both_fetching = threading.Barrier(2, timeout=5)
+
+    def get_space(space_id):
+        fetched.append(space_id)
+        if space_id == "broken":
+            raise ValueError("no access")
+        if len(fetched) <= 3:
+            # The initial fetches only complete once both of them started
+            both_fetching.wait()
+        return DummySpace(f"title {len(fetched)}")
+
+    client = mock.Mock()
+    client.genie.get_space.side_effect = get_space
+    cache = SpaceCache(ttl_seconds=60, max_concurrency=4)
+
+    spaces = cache.get_spaces(client, ["s1", "s2", "broken"])
+    assert [space["space_id"] for space in spaces] == ["s1", "s2", "broken"]
+    assert spaces[2]["error"] == "no access"
+
+    # Cached spaces are served without fetching them again
+    assert cache.get_spaces(client, ["s1", "s2"]) == spaces[:2]
+    assert len(fetched) == 3
+
+    # Stale spaces are served while they are fetched again in the background
+    cache.ttl_seconds = 0.0001
+    time.sleep(0.01)
+    assert cache.get_space(client, "s1") == spaces[0]
+    cache._pool.shutdown(wait=True)
+    cache.ttl_seconds = 60
+    assert cache.get_space(client, "s1")["title"] == "title 4"
+
+
+class DummyAskGenieAPI:
+    def __init__(self, statuses_by_space):
+        self.statuses_by_space = statuses_by_space
+        self.started = []
+
+    def start_conversation(self, space_id, content):
+        if isinstance(self.statuses_by_space[space_id], Exception):
+            raise self.statuses_by_space[space_id]
+        self.started.append(space_id)
+        return mock.Mock(
+            response=mock.Mock(conversation_id=f"c-{space_id}", message_id="m1")
+        )
+
+    def get_message(self, space_id, conversation_id, message_id):
+        statuses = self.statuses_by_space[space_id]
+        return DummyMessage(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_tool_executor",
+    new=lambda: ToolExecutor(limits={}),
+)
+def test_ask_spaces_first_answer_wins():
+    client = mock.Mock()
+    client.genie = DummyAskGenieAPI(
+        {"s1": ["FAILED"], "s2": ["COMPLETED"], "s3": ["ASKING_AI"]}
+    )
+    args = {"content": "How many orders?", "mode": "first"}
+    result = anyio.run(_ask_spaces, client, args, ["s1", "s2", "s3"])
+    payload = json.loads(result[0].text)
+    assert payload["answered_by"] == "s2"
+    results = {r["space_id"]: r for r in payload["results"]}
+    assert results["s1"]["status"] == "FAILED"
+    assert results["s2"]["status"] == "COMPLETED"
+    # Still running when s2 answered, the conversation is abandoned
+    assert results["s3"]["status"] != "COMPLETED"
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.genie.get_tool_executor",
+    new=lambda: ToolExecutor(limits={}),
+)
+def test_ask_spaces_collects_all_answers_within_deadline():
+    client = mock.Mock()
+    client.genie = DummyAskGenieAPI(
+        {
+            "s1": ["COMPLETED"],
+            "s2": ["SUBMITTED", "COMPLETED"],
+            "s3": ["ASKING_AI"],
+            "s4": RuntimeError("no access"),
+        }
+    )
+    args = {
+        "content": "How many orders?",
+        "mode": "all",
+        "space_ids": ["s1", "s2", "s3", "s4"],
+        "timeout_seconds": 1,
+    }
+    start_time = time.monotonic()
+    result = anyio.run(_ask_spaces, client, args, ["s1", "s2", "s3", "s4"])
+    assert time.monotonic() - start_time < 5
+    payload = json.loads(result[0].text)
+    assert payload["answered_by"] == "s1"
+    statuses = {r["space_id"]: r["status"] for r in payload["results"]}
+    assert statuses == {
+        "s1": "COMPLETED",
+        "s2": "COMPLETED",
+        "s3": "ASKING_AI",
+        "s4": None,
+    }
+    assert payload["results"][3]["error"] == "no access"
+
+
+def test_ask_spaces_rejects_unknown_spaces():
+    args = {"content": "How many orders?", "space_ids": ["other"]}
+    with pytest.raises(ValueError, match="Unknown Genie spaces"):
+        anyio.run(_ask_spaces, mock.Mock(), args, ["s1"])
@@ -0,0 +1,153 @@
+from unittest import mock
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from databricks.labs.mcp.metrics import MetricsRegistry, get_metrics_route
+from databricks.labs.mcp.servers.unity_catalog.tools import register_metrics
+from databricks.labs.mcp.servers.unity_catalog.tools.cache import ResultCache
+from databricks.labs.mcp.servers.unity_catalog.tools.clients import (
+    UPSTREAM_CALL_ERRORS,
+    UPSTREAM_CALL_SECONDS,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import (
+    TOOL_CALL_ERRORS,
+    TOOL_CALL_SECONDS,
+    WORKER_CALL_SECONDS,
+    ToolExecutor,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.functions import (
+    FunctionResultCache,
+    UCFunctionTool,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.registry import ToolRegistry
+
+
+def test_render_exposition_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("calls_total", "Calls", ("tool",))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    histogram = registry.histogram("latency_seconds", "Latency", ("tool",))
+    histogram.observe(0.003, "t")
+    histogram.observe(7, "t")
+    registry.collected("sessions", "Sessions", (), lambda: [((), 3)])
+
+    lines = registry.render().splitlines()
+    assert "# TYPE calls_total counter" in lines
+    assert 'calls_total{tool="a\\"b"} 3' in lines
+    assert 'latency_seconds_bucket{tool="t",le="0.005"} 1' in lines
+    assert 'latency_seconds_bucket{tool="t",le="5.0"} 1' in lines
+    assert 'latency_seconds_bucket{tool="t",le="+Inf"} 2' in lines
+    assert 'latency_seconds_count{tool="t"} 2' in lines
+    assert 'latency_seconds_sum{tool="t"} 7.003' in lines
+    assert "# TYPE sessions gauge" in lines
+    assert "sessions 3" in lines
+
+
+def test_metrics_route():
+    registry = MetricsRegistry()
+    registry.collected("sessions", "Sessions", (), lambda: [((), 1)])
+    client = TestClient(Starlette(routes=[get_metrics_route(registry)]))
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "sessions 1" in response.text
+
+
+class DummyTool:
+    name = "metrics_dummy_tool"
+    family = "metrics_dummy"
+    coalesce_calls = False
+    is_async = False
+
+    def execute(self, fail=False):
+        if fail:
+            raise ValueError("failed")
+        return "ok"
+
+
+def get_count(histogram, *label_values):
+    return {
+        labels: value
+        for suffix, _, labels, value in histogram.samples()
+        if suffix == "_count"
+    }.get(label_values, 0)
+
+
+def test_executor_records_tool_and_worker_calls():
+    executor = ToolExecutor(limits={})
+    tool = DummyTool()
+    calls = get_count(TOOL_CALL_SECONDS, tool.name)
+    worker_calls = get_count(WORKER_CALL_SECONDS, tool.family)
+
+    assert anyio.run(executor.execute, tool, {}) == "ok"
+    with pytest.raises(ValueError):
+        anyio.run(executor.execute, tool, {"fail": True})
+
+    assert get_count(TOOL_CALL_SECONDS, tool.name) == calls + 2
+    assert get_count(WORKER_CALL_SECONDS, tool.family) == worker_calls + 2
+    errors = dict((labels, value) for _, _, labels, value in TOOL_CALL_ERRORS.samples())
+    assert errors[(tool.name,)] >= 1
+
+
+def get_error_count(counter, *label_values):
+    return {labels: value for _, _, labels, value in counter.samples()}.get(
+        label_values, 0
+    )
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions."
+    "get_function_result_cache",
+    return_value=FunctionResultCache(max_bytes=1024),
+)
+def test_upstream_calls_exclude_cache_hits(_):
+    client = mock.Mock()
+    client.execute_function.return_value = mock.Mock(value="ok", error=None)
+    tool = UCFunctionTool(
+        None, client, "cat.sch.f", is_deterministic=True, result_cache_ttl_seconds=60
+    )
+    upstream_calls = get_count(UPSTREAM_CALL_SECONDS, "uc_function")
+    upstream_errors = get_error_count(UPSTREAM_CALL_ERRORS, "uc_function")
+
+    tool.execute(x=1)
+    tool.execute(x=1)
+    client.execute_function.side_effect = RuntimeError("unavailable")
+    with pytest.raises(RuntimeError):
+        tool.execute(x=2)
+
+    assert client.execute_function.call_count == 2
+    assert get_count(UPSTREAM_CALL_SECONDS, "uc_function") == upstream_calls + 2
+    assert get_error_count(UPSTREAM_CALL_ERRORS, "uc_function") == upstream_errors + 1
+
+
+def test_register_metrics(monkeypatch):
+    cache = ResultCache(max_bytes=1024)
+    cache.put("key", "value", ttl_seconds=60)
+    cache.get("key")
+    registry = MetricsRegistry()
+    monkeypatch.setattr(
+        "databricks.labs.mcp.servers.unity_catalog.tools.METRICS", registry
+    )
+    monkeypatch.setattr(
+        "databricks.labs.mcp.servers.unity_catalog.tools.RESULT_CACHES",
+        {"genie": lambda: cache},
+    )
+    executor = ToolExecutor(limits={"genie": 2})
+    with mock.patch(
+        "databricks.labs.mcp.servers.unity_catalog.tools.get_tool_executor",
+        return_value=executor,
+    ):
+        register_metrics(ToolRegistry({}))
+        lines = registry.render().splitlines()
+
+    assert "mcp_tools 0" in lines
+    assert "mcp_sessions 0" in lines
+    assert 'mcp_executor_limit{family="genie"} 2' in lines
+    assert 'mcp_executor_in_flight{family="genie"} 0' in lines
+    assert "mcp_coalesced_calls_total 0" in lines
+    assert 'mcp_result_cache_hits_total{cache="genie"} 1' in lines
+    assert 'mcp_result_cache_entries{cache="genie"} 1' in lines
@@ -0,0 +1,97 @@
+from unittest import mock
+
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.server.lowlevel.server import request_ctx
+from mcp.types import Tool as ToolSpec
+
+from databricks.labs.mcp.servers.unity_catalog.tools.base_tool import BaseTool
+from databricks.labs.mcp.servers.unity_catalog.tools.registry import (
+    ToolRegistry,
+    materialize_tool_specs,
+)
+
+
+class DummyTool(BaseTool):
+    def execute(self, **kwargs):
+        pass
+
+
+def make_tool(name, description="desc"):
+    return DummyTool(ToolSpec(name=name, description=description, inputSchema={}))
+
+
+def test_swap_reports_spec_changes():
+    tool = make_tool("a")
+    registry = ToolRegistry({"a": tool})
+    assert registry.swap({"a": tool}) is False
+    assert registry.swap({"a": make_tool("a")}) is False
+    assert registry.swap({"a": make_tool("a", "new description")}) is True
+    assert registry.swap({"b": make_tool("b")}) is True
+    assert registry.get_tool("b").tool_spec.name == "b"
+
+
+def test_notify_tools_changed_reaches_tracked_sessions():
+    registry = ToolRegistry({})
+    session = mock.Mock()
+    session.send_tool_list_changed = mock.AsyncMock()
+    broken_session = mock.Mock()
+    broken_session.send_tool_list_changed = mock.AsyncMock(side_effect=RuntimeError)
+
+    async def main():
+        for s in (session, broken_session):
+            token = request_ctx.set(mock.Mock(session=s))
+            registry.track_current_session()
+            request_ctx.reset(token)
+        # the catalog refresher notifies from its own thread
+        await anyio.to_thread.run_sync(registry.notify_tools_changed)
+        await anyio.to_thread.run_sync(registry.notify_tools_changed)
+
+    anyio.run(main)
+    assert session.send_tool_list_changed.await_count == 2
+    # sessions that fail to receive a notification are forgotten
+    assert broken_session.send_tool_list_changed.await_count == 1
+
+
+def test_list_tools_page():
+    registry = ToolRegistry({name: make_tool(name) for name in "abcde"})
+
+    tools, cursor = registry.list_tools_page(None, page_size=2)
+    assert [t.name for t in tools] == ["a", "b"]
+    tools, cursor = registry.list_tools_page(cursor, page_size=2)
+    assert [t.name for t in tools] == ["c", "d"]
+    tools, cursor = registry.list_tools_page(cursor, page_size=2)
+    assert [t.name for t in tools] == ["e"]
+    assert cursor is None
+
+    tools, cursor = registry.list_tools_page(None, page_size=0)
+    assert len(tools) == 5 and cursor is None
+
+    for invalid_cursor in ["not-a-cursor", "2", "e30="]:
+        with pytest.raises(McpError):
+            registry.list_tools_page(invalid_cursor, page_size=2)
+
+
+def test_list_tools_page_across_swaps():
+    registry = ToolRegistry({name: make_tool(name) for name in "bdf"})
+    tools, cursor = registry.list_tools_page(None, page_size=2)
+    assert [t.name for t in tools] == ["b", "d"]
+
+    # Tools added before and after the cursor, and the last tool of the page removed
+    registry.swap({name: make_tool(name) for name in "acef"})
+    tools, cursor = registry.list_tools_page(cursor, page_size=2)
+    assert [t.name for t in tools] == ["e", "f"]
+    assert cursor is None
+
+
+def test_materialize_tool_specs_skips_failing_tools():
+    class BrokenTool(DummyTool):
+        name = "broken"
+
+        @property
+        def tool_spec(self):
+            raise PermissionError("no access")
+
+    specs = materialize_tool_specs([make_tool("a"), BrokenTool(None)], 2)
+    assert [spec.name for spec in specs] == ["a"]
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from databricks.labs.mcp.servers.unity_catalog.tools import list_all_tools
+from databricks.labs.mcp.servers.unity_catalog.tools.functions import UCFunctionTool
+from databricks.labs.mcp.servers.unity_catalog.tools.schemas import (
+    resolve_schema_full_names,
+)
+
+
+class DummyInfo:
+    def __init__(self, name):
+        self.name = name
+
+
+SCHEMAS = {
+    "main": ["default", "sales", "information_schema"],
+    "dev_a": ["sales", "hr"],
+    "dev_b": ["sales_eu"],
+}
+
+
+def make_workspace_client():
+    client = mock.Mock()
+    client.catalogs.list.return_value = [DummyInfo(name) for name in SCHEMAS]
+    client.schemas.list.side_effect = lambda catalog_name: [
+        DummyInfo(name) for name in SCHEMAS[catalog_name]
+    ]
+    return client
+
+
+def test_resolve_exact_names_without_listing():
+    client = make_workspace_client()
+    assert resolve_schema_full_names(client, ["a.b", "c.d", "a.b"]) == ["a.b", "c.d"]
+    client.catalogs.list.assert_not_called()
+    client.schemas.list.assert_not_called()
+
+
+def test_resolve_schema_wildcard():
+    client = make_workspace_client()
+    assert resolve_schema_full_names(client, ["main.*"]) == [
+        "main.default",
+        "main.sales",
+    ]
+    client.catalogs.list.assert_not_called()
+
+
+def test_resolve_catalog_and_schema_wildcards():
+    client = make_workspace_client()
+    assert resolve_schema_full_names(client, ["dev_*.sales*", "main.default"]) == [
+        "dev_a.sales",
+        "dev_b.sales_eu",
+        "main.default",
+    ]
+    assert client.schemas.list.call_count == 2
+
+
+def test_resolve_explicit_information_schema():
+    client = make_workspace_client()
+    assert resolve_schema_full_names(client, ["main.information_schema"]) == [
+        "main.information_schema"
+    ]
+
+
+def test_resolve_catalog_wildcard_with_literal_schema():
+    client = make_workspace_client()
+    assert resolve_schema_full_names(client, ["*.sales", "*.information_schema"]) == [
+        "main.sales",
+        "dev_a.sales",
+        "main.information_schema",
+    ]
+
+
+def list_failing_uc_function_tools(settings, schema_full_name, previous_tools):
+    if schema_full_name == "main.sales":
+        raise RuntimeError("schema was dropped")
+    return [UCFunctionTool(None, None, f"{schema_full_name}.f")]
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.resolve_schema_full_names",
+    return_value=["main.default", "main.sales"],
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.get_workspace_client",
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.list_genie_tools",
+    return_value=[],
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.list_vector_search_tools",
+    return_value=[],
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.list_uc_function_tools",
+    new=list_failing_uc_function_tools,
+)
+def test_failing_schema_keeps_its_previous_tools(*_):
+    settings = mock.Mock(
+        schema_full_name="main.*",
+        discovery_max_concurrency=4,
+        uc_function_batch_tools=False,
+        vector_search_batch_tools=False,
+    )
+    tools = list_all_tools(settings)
+    assert [tool.uc_function_name for tool in tools] == ["main.default.f"]
+
+    previous_tool = UCFunctionTool(None, None, "main.sales.f")
+    tools = list_all_tools(settings, previous_tools=[previous_tool])
+    assert [tool.uc_function_name for tool in tools] == [
+        "main.default.f",
+        "main.sales.f",
+    ]
@@ -0,0 +1,106 @@
+import json
+from unittest import mock
+
+from databricks.labs.mcp.servers.unity_catalog.tools import _materialize_tool_specs
+from databricks.labs.mcp.servers.unity_catalog.tools.functions import UCFunctionTool
+from databricks.labs.mcp.servers.unity_catalog.tools.registry import ToolRegistry
+from databricks.labs.mcp.servers.unity_catalog.tools.snapshot import (
+    get_snapshot_path,
+    load_snapshot,
+    save_snapshot,
+)
+from databricks.labs.mcp.servers.unity_catalog.tools.vector_search import (
+    VectorSearchTool,
+)
+
+
+class DummySettings:
+    schema_full_name = "cat.sch"
+    genie_space_ids = ["s1"]
+    vector_search_num_results = 3
+    vector_search_index_cache_ttl_seconds = 60
+    vector_search_result_cache_ttl_seconds = 300
+    vector_search_max_cell_bytes = 1000
+    vector_search_max_response_bytes = 10000
+    vector_search_result_cache_excluded_indexes = ["cat.sch.excluded"]
+    uc_function_result_cache_ttl_seconds = 3600
+    uc_function_result_cache_ttl_overrides = ["cat.sch.f=60"]
+
+    def __init__(self, catalog_snapshot_dir):
+        self.catalog_snapshot_dir = catalog_snapshot_dir
+
+
+def test_snapshot_path_depends_on_workspace_and_settings(tmp_path):
+    settings = DummySettings(str(tmp_path))
+    path = get_snapshot_path(settings, host="https://a")
+    assert path.parent == tmp_path
+    assert path == get_snapshot_path(settings, host="https://a")
+    assert path != get_snapshot_path(settings, host="https://b")
+    settings.genie_space_ids = ["s2"]
+    assert path != get_snapshot_path(settings, host="https://a")
+
+
+def test_snapshots_can_be_disabled():
+    assert get_snapshot_path(DummySettings(""), host="https://a") is None
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.snapshot.get_function_client",
+    return_value="client",
+)
+def test_snapshot_round_trip(_, tmp_path):
+    settings = DummySettings(str(tmp_path))
+    path = tmp_path / "nested" / "snapshot.json"
+    tool_obj = {
+        "function": {"name": "cat__sch__f", "description": "d", "parameters": {}}
+    }
+    tools = [
+        VectorSearchTool("endpoint", "cat.sch.idx", "vector_search_idx", ["a", "b"]),
+        UCFunctionTool(tool_obj, "client", "cat.sch.f", is_deterministic=True),
+    ]
+    save_snapshot(path, tools)
+
+    restored = load_snapshot(path, settings)
+
+    assert [t.tool_spec for t in restored] == [t.tool_spec for t in tools]
+    assert restored[0].columns == ["a", "b"]
+    assert restored[0].num_results == 3
+    assert restored[0].result_cache_ttl_seconds == 300
+    assert restored[1].uc_function_name == "cat.sch.f"
+    assert restored[1].client == "client"
+    assert restored[1].is_deterministic
+    assert restored[1].result_cache_ttl_seconds == 60
+
+
+def test_missing_or_incompatible_snapshot_is_ignored(tmp_path):
+    settings = DummySettings(str(tmp_path))
+    path = tmp_path / "snapshot.json"
+    assert load_snapshot(path, settings) is None
+    path.write_text(json.dumps({"format": -1}))
+    assert load_snapshot(path, settings) is None
+    path.write_text("{not json")
+    assert load_snapshot(path, settings) is None
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.functions.UCFunctionToolkit"
+)
+def test_fetched_function_definitions_are_snapshotted(MockToolkit, tmp_path):
+    tool_obj = {
+        "function": {"name": "cat__sch__f", "description": "d", "parameters": {}}
+    }
+    MockToolkit.return_value.tools_dict = {"cat.sch.f": tool_obj}
+    path = tmp_path / "snapshot.json"
+    tool = UCFunctionTool(None, "client", "cat.sch.f", updated_at=1)
+    registry = ToolRegistry({tool.name: tool})
+    save_snapshot(path, [tool])
+    assert json.loads(path.read_text())["uc_functions"][0]["tool_obj"] is None
+
+    specs = _materialize_tool_specs(registry, [tool], path, max_concurrency=1)
+
+    assert [spec.name for spec in specs] == ["cat__sch__f"]
+    assert json.loads(path.read_text())["uc_functions"][0]["tool_obj"] == tool_obj
+    # Pages without new definitions leave the snapshot alone
+    path.unlink()
+    _materialize_tool_specs(registry, [tool], path, max_concurrency=1)
+    assert not path.exists()
@@ -1,9 +1,18 @@
+import json
 from unittest import mock
+
+import pytest
 from databricks.labs.mcp.servers.unity_catalog.tools.vector_search import (
+    _is_stale_index_error,
     _list_vector_search_tools,
+    encode_search_results,
     list_vector_search_tools,
+    SearchResultCache,
+    VectorSearchBatchTool,
     VectorSearchTool,
+    with_batch_tools,
 )
+from databricks.labs.mcp.servers.unity_catalog.tools.executor import ToolExecutor
 
 
 class DummyTable:
@@ -46,15 +55,21 @@ class DummyWorkspaceClient:
 class DummySettings:
     schema_full_name = "cat.sch"
     vector_search_num_results = 5
+    vector_search_index_cache_ttl_seconds = 900
+    vector_search_result_cache_ttl_seconds = 300
+    vector_search_max_cell_bytes = 1000
+    vector_search_max_response_bytes = 10000
+    vector_search_result_cache_excluded_indexes = []
+    discovery_max_concurrency = 4
 
 
 @mock.patch(
-    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.WorkspaceClient",
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_workspace_client",
     new=DummyWorkspaceClient,
 )
 def test_list_vector_search_tools_filters_and_returns_expected():
     settings = DummySettings()
-    tools = list_vector_search_tools(settings)
+    tools = list_vector_search_tools(settings, "cat.sch")
     assert len(tools) == 1
     tool = tools[0]
     assert isinstance(tool, VectorSearchTool)
@@ -62,6 +77,19 @@ def test_list_vector_search_tools_filters_and_returns_expected():
     assert tool.columns == ["col1", "col2"]  # filtered out "__db_content_vector"
 
 
+def test_list_vector_search_tools_uses_listed_columns():
+    client = DummyWorkspaceClient()
+    listed_tables = client.tables.list()
+    listed_tables[0].columns = client.tables.get("cat.sch.tbl1").columns[:1]
+    client.tables = mock.Mock()
+    client.tables.list.return_value = listed_tables
+
+    tools = _list_vector_search_tools(client, "cat", "sch", vector_search_num_results=5)
+
+    assert [t.columns for t in tools] == [["col1"]]
+    client.tables.get.assert_not_called()
+
+
 def test_internal_list_vector_search_tools_direct():
     client = DummyWorkspaceClient()
     tools = _list_vector_search_tools(client, "cat", "sch", vector_search_num_results=5)
@@ -71,8 +99,64 @@ def test_internal_list_vector_search_tools_direct():
     assert tools[0].columns == ["col1", "col2"]
 
 
+def test_list_vector_search_tools_qualified_tool_names():
+    client = DummyWorkspaceClient()
+    tools = _list_vector_search_tools(
+        client, "cat", "sch", vector_search_num_results=5, qualify_tool_names=True
+    )
+    assert [t.name for t in tools] == ["vector_search_cat__sch__tbl1"]
+
+
+def test_vector_search_tool_names_are_bounded():
+    client = DummyWorkspaceClient()
+    table = DummyTable(
+        full_name="cat.sch." + "t" * 50, properties={"model_endpoint_url": "url1"}
+    )
+    client.tables.list = lambda **_: [table]
+    tools = _list_vector_search_tools(
+        client, "cat", "sch", vector_search_num_results=5, qualify_tool_names=True
+    )
+    assert len(tools[0].name) == 64
+    assert tools[0].name.startswith("vector_search_cat__sch__ttt")
+
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "v" * 64, ["c"])
+    batch_name = VectorSearchBatchTool(tool).name
+    assert len(batch_name) == 64
+    assert batch_name != tool.name
+
+
+def test_list_vector_search_tools_reuses_only_identically_named_tools():
+    client = DummyWorkspaceClient()
+    listed_tables = client.tables.list()
+    for table in listed_tables:
+        table.updated_at = 1
+    client.tables.list = lambda **kwargs: listed_tables
+
+    (previous_tool,) = _list_vector_search_tools(
+        client, "cat", "sch", vector_search_num_results=5
+    )
+    (tool,) = _list_vector_search_tools(
+        client,
+        "cat",
+        "sch",
+        vector_search_num_results=5,
+        previous_tools=[previous_tool],
+    )
+    assert tool is previous_tool
+
+    (tool,) = _list_vector_search_tools(
+        client,
+        "cat",
+        "sch",
+        vector_search_num_results=5,
+        previous_tools=[previous_tool],
+        qualify_tool_names=True,
+    )
+    assert tool.name == "vector_search_cat__sch__tbl1"
+
+
 @mock.patch(
-    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.VectorSearchClient"
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
 )
 def test_vector_search_tool_execute(MockVectorSearchClient):
     mock_index = mock.Mock()
@@ -93,5 +177,235 @@ def test_vector_search_tool_execute(MockVectorSearchClient):
     result = tool.execute(query="test query")
 
     assert isinstance(result, list)
-    assert result[0].text.strip().startswith("[")  # It should be JSON string
-    assert "score" in result[0].text
+    assert json.loads(result[0].text) == {
+        "columns": ["col1", "col2", "score"],
+        "rows": [{"id": 1, "score": 0.9}],
+    }
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
+)
+def test_vector_search_tool_reuses_cached_index(MockVectorSearchClient):
+    mock_index = mock.Mock()
+    mock_index.similarity_search.return_value = {"result": {"data_array": []}}
+    MockVectorSearchClient.return_value.get_index.return_value = mock_index
+
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "vector_search_test", ["col1"])
+    tool.execute(query="first")
+    tool.execute(query="second")
+
+    assert MockVectorSearchClient.return_value.get_index.call_count == 1
+    assert mock_index.similarity_search.call_count == 2
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
+)
+def test_vector_search_tool_refreshes_index_on_stale_error(MockVectorSearchClient):
+    stale_index = mock.Mock()
+    stale_index.similarity_search.side_effect = Exception(
+        "Response content b'RESOURCE_DOES_NOT_EXIST', status_code 404"
+    )
+    fresh_index = mock.Mock()
+    fresh_index.similarity_search.return_value = {"result": {"data_array": [[1]]}}
+    MockVectorSearchClient.return_value.get_index.side_effect = [
+        stale_index,
+        fresh_index,
+    ]
+
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "vector_search_test", ["old"])
+    result = tool.execute(query="test query")
+
+    assert "1" in result[0].text
+    # The columns of the advertised tool spec are kept
+    assert tool.columns == ["old"]
+    fresh_index.similarity_search.assert_called_once_with(
+        query_text="test query", columns=["old"], num_results=5
+    )
+
+
+@pytest.mark.parametrize(
+    "message,stale",
+    [
+        ("Response content b'RESOURCE_DOES_NOT_EXIST', status_code 404", True),
+        (
+            "Response content b'INVALID_PARAMETER_VALUE: Column col3 not found', "
+            "status_code 400",
+            True,
+        ),
+        (
+            "Response content b'INVALID_PARAMETER_VALUE: num_results', "
+            "status_code 400",
+            False,
+        ),
+        ("Response content b'Unauthorized', status_code 401", False),
+        ("Response content b'PERMISSION_DENIED', status_code 403", False),
+    ],
+)
+def test_is_stale_index_error(message, stale):
+    assert _is_stale_index_error(Exception(message)) == stale
+
+
+def test_search_result_cache_expires_and_evicts():
+    cache = SearchResultCache(max_bytes=20)
+    key1 = cache.make_key("idx", "  hello   world ", ["a"], 5)
+    assert key1 == cache.make_key("idx", "hello world", ["a"], 5)
+    assert cache.get(key1) is None
+
+    cache.put(key1, [[1, "abc"]], ttl_seconds=60)
+    assert cache.get(key1) == [[1, "abc"]]
+
+    key2 = cache.make_key("idx", "other", ["a"], 5)
+    cache.put(key2, [[2, "def"]], ttl_seconds=60)
+    # Both entries do not fit in the budget, the least recently used one is evicted
+    assert cache.get(key1) is None
+    assert cache.get(key2) == [[2, "def"]]
+
+    cache.put(key2, [[2]], ttl_seconds=0)
+    assert cache.get(key2) is None
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 0,
+        "bytes": 0,
+    }
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_search_result_cache",
+    return_value=SearchResultCache(max_bytes=1024),
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
+)
+def test_vector_search_tool_caches_results(MockVectorSearchClient, MockCache):
+    mock_index = mock.Mock()
+    mock_index.similarity_search.return_value = {"result": {"data_array": [[1]]}}
+    MockVectorSearchClient.return_value.get_index.return_value = mock_index
+
+    tool = VectorSearchTool(
+        "endpoint1",
+        "cat.sch.tbl1",
+        "vector_search_test",
+        ["col1"],
+        result_cache_ttl_seconds=60,
+    )
+    first = tool.execute(query="what is mcp")
+    second = tool.execute(query="what  is mcp ")
+    tool.execute(query="something else")
+
+    assert first == second
+    assert mock_index.similarity_search.call_count == 2
+    assert MockCache.return_value.stats()["hits"] == 1
+
+
+def test_list_vector_search_tools_result_cache_opt_out():
+    client = DummyWorkspaceClient()
+    client.tables.list = lambda catalog_name, schema_name: [
+        DummyTable("cat.sch.cached", {"model_endpoint_url": "url1"}),
+        DummyTable("cat.sch.live", {"model_endpoint_url": "url1"}),
+    ]
+    tools = _list_vector_search_tools(
+        client,
+        "cat",
+        "sch",
+        vector_search_num_results=5,
+        result_cache_ttl_seconds=300,
+        result_cache_excluded_indexes=["cat.sch.live*"],
+    )
+    assert [t.result_cache_ttl_seconds for t in tools] == [300, 0]
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_tool_executor",
+    return_value=ToolExecutor(limits={}),
+)
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
+)
+def test_vector_search_batch_tool(MockVectorSearchClient, _):
+    rows = {
+        "q1": [["doc1", 0.9], ["doc2", 0.8]],
+        "q2": [["doc2", 0.7], ["doc3", 0.6]],
+    }
+    mock_index = mock.Mock()
+    mock_index.similarity_search.side_effect = lambda query_text, **_: {
+        "result": {"data_array": rows[query_text]}
+    }
+    MockVectorSearchClient.return_value.get_index.return_value = mock_index
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "vector_search_tbl1", ["c"])
+    batch_tool = VectorSearchBatchTool(tool, max_concurrency=2)
+    assert batch_tool.name == "vector_search_tbl1_batch"
+
+    result = json.loads(batch_tool.execute(queries=["q1", "q2"])[0].text)
+    assert result == {
+        "columns": ["c", "score"],
+        "results": [
+            {"query": "q1", "rows": rows["q1"]},
+            {"query": "q2", "rows": rows["q2"]},
+        ],
+    }
+
+    result = json.loads(
+        batch_tool.execute(queries=["q1", "q2"], deduplicate=True)[0].text
+    )
+    assert [group["rows"] for group in result["results"]] == [
+        rows["q1"],
+        [["doc3", 0.6]],
+    ]
+
+
+def test_with_batch_tools():
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "vector_search_tbl1", ["c"])
+    settings = DummySettings()
+    settings.vector_search_batch_tools = True
+    settings.vector_search_batch_max_concurrency = 2
+    assert [t.name for t in with_batch_tools([tool], settings)] == [
+        "vector_search_tbl1",
+        "vector_search_tbl1_batch",
+    ]
+    settings.vector_search_batch_tools = False
+    assert with_batch_tools([tool], settings) == [tool]
+
+
+@mock.patch(
+    "databricks.labs.mcp.servers.unity_catalog.tools.vector_search.get_vector_search_client"
+)
+def test_vector_search_tool_column_projection(MockVectorSearchClient):
+    mock_index = mock.Mock()
+    mock_index.similarity_search.return_value = {"result": {"data_array": [["a", 1]]}}
+    MockVectorSearchClient.return_value.get_index.return_value = mock_index
+    tool = VectorSearchTool("endpoint1", "cat.sch.tbl1", "vs", ["col1", "col2"])
+
+    result = json.loads(tool.execute(query="q", columns=["col2"])[0].text)
+
+    assert result["columns"] == ["col2", "score"]
+    mock_index.similarity_search.assert_called_once_with(
+        query_text="q", columns=["col2"], num_results=5
+    )
+    with pytest.raises(ValueError, match="col3"):
+        tool.execute(query="q", columns=["col3"])
+
+
+def test_encode_search_results_applies_byte_budgets():
+    rows = [["x" * 100, 0.9], ["short", 0.8], ["also short", 0.7]]
+
+    encoded = encode_search_results(["text"], [(None, rows)], max_cell_bytes=10)
+    assert json.loads(encoded)["rows"][0] == ["xxxxxxxxxx...[truncated]", 0.9]
+    assert " " not in encoded.replace("also short", "")
+
+    encoded = encode_search_results(
+        ["text"], [(None, rows)], max_cell_bytes=10, max_response_bytes=100
+    )
+    assert len(encoded.encode()) <= 100
+    assert json.loads(encoded)["omitted_rows"] == 2
+
+    encoded = encode_search_results(
+        ["text"], [("q1", rows[:1]), ("q2", rows[1:])], max_response_bytes=0
+    )
+    assert [group["query"] for group in json.loads(encoded)["results"]] == [
+        "q1",
+        "q2",
+    ]